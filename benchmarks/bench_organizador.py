@@ -0,0 +1,234 @@
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import tempfile
+import subprocess
+import importlib.util
+
+# Benchmark das operações do menu do organizador sobre árvores de Downloads sintéticas.
+#
+# Cada operação roda em um processo filho próprio (HOME apontando para a árvore gerada),
+# com as confirmações do menu respondidas automaticamente e a saída descartada.
+# O filho mede o tempo, conta as chamadas de sistema feitas pelo módulo os (com o Profiler
+# do próprio organizador, o mesmo do --profile) e informa o pico de memória (RSS);
+# o pai junta tudo em um JSON comparável entre versões.
+
+DEFAULT_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'organizador_v5.0.0.py')
+
+# Operação -> (função do organizador, respostas dadas aos input() na ordem)
+OPERATIONS = {
+    'organize': ('organize_files_in_downloads', ['confirmar', '']),
+    'organize_async': ('organize_files_async', ['confirmar', '']),
+    'clean': ('clean_files', ['limpar', '']),
+    'prune_empty': ('remove_empty_folders', ['remover', '']),
+    'by_date': ('organize_by_date', ['confirmar', '']),
+}
+
+TEMP_EXTENSIONS_FOR_TREE = ['.tmp', '.bak', '.temp']
+
+
+def load_organizer(script_path):
+    """Carrega o script do organizador como módulo (o nome do arquivo tem pontos, então não dá para importar direto)."""
+    spec = importlib.util.spec_from_file_location('organizador', script_path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def generate_tree(home_path, categories, file_count=1000, collision_rate=0.1, depth=3,
+                  temp_ratio=0.05, empty_ratio=0.05, empty_dir_count=50, seed=42):
+    """
+    Gera uma árvore de Downloads reproduzível em 'home_path'/storage/downloads:
+    arquivos soltos na raiz (extensões sorteadas de 'categories'), pastas aninhadas até
+    'depth' níveis com arquivos temporários e vazios, pastas vazias e, para uma fração
+    'collision_rate' dos arquivos, um arquivo de mesmo nome já organizado no destino.
+    """
+    rng = random.Random(seed)
+    downloads_path = os.path.join(home_path, 'storage', 'downloads')
+    os.makedirs(downloads_path, exist_ok=True)
+    extensions = sorted(categories) + ['.xyz', '']
+
+    # Datas espalhadas pelos últimos três anos, para o modo por data criar várias pastas
+    now = time.time()
+
+    for i in range(file_count):
+        extension = rng.choice(extensions)
+        file_name = f"arquivo_{i:06d}{extension}"
+        roll = rng.random()
+
+        if roll < temp_ratio:
+            # Arquivos temporários e vazios ficam nas subpastas, como no uso real
+            file_name = f"arquivo_{i:06d}{rng.choice(TEMP_EXTENSIONS_FOR_TREE)}"
+            parent = os.path.join(downloads_path, *[f"pasta_{rng.randrange(5)}" for _ in range(rng.randint(1, depth))])
+            content = b'x' * rng.randint(1, 2048)
+        elif roll < temp_ratio + empty_ratio:
+            parent = os.path.join(downloads_path, *[f"pasta_{rng.randrange(5)}" for _ in range(rng.randint(1, depth))])
+            content = b''
+        else:
+            parent = downloads_path
+            content = b'x' * rng.randint(1, 4096)
+
+        os.makedirs(parent, exist_ok=True)
+        file_path = os.path.join(parent, file_name)
+        with open(file_path, 'wb') as f:
+            f.write(content)
+        timestamp = now - rng.randint(0, 3 * 365 * 86400)
+        os.utime(file_path, (timestamp, timestamp))
+
+        if parent == downloads_path and rng.random() < collision_rate:
+            category = categories.get(extension.lower(), 'Diversos')
+            existing_dir = os.path.join(downloads_path, 'Arquivos', category, f"{category}{extension.upper()}")
+            os.makedirs(existing_dir, exist_ok=True)
+            with open(os.path.join(existing_dir, file_name), 'wb') as f:
+                f.write(b'ja organizado')
+
+    for i in range(empty_dir_count):
+        nested = [f"vazia_{i}"] + [f"nivel_{level}" for level in range(rng.randint(0, depth - 1))]
+        os.makedirs(os.path.join(downloads_path, 'Pastas_Antigas', *nested), exist_ok=True)
+
+    return downloads_path
+
+
+def run_operation_in_child(script_path, operation, result_path):
+    """Executado no processo filho: roda uma operação e grava as medições em 'result_path'."""
+    import builtins
+    import resource
+
+    organizer = load_organizer(script_path)
+    function_name, answers = OPERATIONS[operation]
+    function = getattr(organizer, function_name)
+    # Versões antigas não têm o Profiler: as chamadas são contadas pelo da versão atual,
+    # que troca as funções do módulo os compartilhado por todas as versões carregadas
+    profiler = getattr(organizer, 'PROFILER', None) or load_organizer(DEFAULT_SCRIPT).PROFILER
+
+    pending_answers = list(answers)
+    builtins.input = lambda prompt='': pending_answers.pop(0) if pending_answers else ''
+
+    real_stdout = sys.stdout
+    sys.stdout = open(os.devnull, 'w')
+    profiler.start()
+    try:
+        start_time = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - start_time
+    finally:
+        profiler.stop()
+        sys.stdout.close()
+        sys.stdout = real_stdout
+
+    counts = {category: calls for category, (calls, _) in profiler.syscalls.items() if calls}
+    result = {
+        'seconds': round(elapsed, 4),
+        'syscalls': counts,
+        'syscalls_total': sum(counts.values()),
+        'phases': {name: round(seconds, 4) for name, (_, seconds) in profiler.phases.items()},
+        'peak_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    }
+    with open(result_path, 'w') as f:
+        json.dump(result, f)
+
+
+def run_benchmarks(script_path, operations, tree_options, repeat=1):
+    """Gera uma árvore nova para cada execução de cada operação e coleta as medições."""
+    categories = load_organizer(script_path).FILE_CATEGORIES
+    results = {}
+
+    for operation in operations:
+        runs = []
+        for _ in range(repeat):
+            work_dir = tempfile.mkdtemp(prefix='bench_organizador_')
+            try:
+                home_path = os.path.join(work_dir, 'home')
+                generate_tree(home_path, categories, **tree_options)
+                result_path = os.path.join(work_dir, 'resultado.json')
+                env = dict(os.environ, HOME=home_path, XDG_DATA_HOME=os.path.join(work_dir, 'dados'))
+                subprocess.run([sys.executable, os.path.abspath(__file__), '--child', operation,
+                                '--script', script_path, '--child-result', result_path],
+                               env=env, check=True, stdin=subprocess.DEVNULL)
+                with open(result_path) as f:
+                    runs.append(json.load(f))
+            finally:
+                shutil.rmtree(work_dir, ignore_errors=True)
+
+        best = min(runs, key=lambda run: run['seconds'])
+        best['runs_seconds'] = [run['seconds'] for run in runs]
+        results[operation] = best
+        print(f"{operation:>12}: {best['seconds']:.3f}s, {best['syscalls_total']} chamadas, "
+              f"pico de {best['peak_rss_kb'] / 1024:.1f} MB")
+
+    return results
+
+
+def compare_results(old_path, new_path):
+    """Mostra lado a lado dois arquivos de resultado (ex: versão anterior x atual)."""
+    with open(old_path) as f:
+        old = json.load(f)
+    with open(new_path) as f:
+        new = json.load(f)
+
+    print(f"{'operação':>12} | {'antes (s)':>10} | {'depois (s)':>10} | {'ganho':>7} | {'chamadas antes/depois':>22}")
+    for operation in sorted(set(old['results']) & set(new['results'])):
+        before, after = old['results'][operation], new['results'][operation]
+        speedup = before['seconds'] / after['seconds'] if after['seconds'] else float('inf')
+        calls = f"{before['syscalls_total']}/{after['syscalls_total']}"
+        print(f"{operation:>12} | {before['seconds']:>10.3f} | {after['seconds']:>10.3f} | {speedup:>6.2f}x | {calls:>22}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark do organizador com árvores de Downloads sintéticas.")
+    parser.add_argument('--script', default=DEFAULT_SCRIPT, help="versão do organizador a medir")
+    parser.add_argument('--operations', nargs='+', choices=sorted(OPERATIONS), default=sorted(OPERATIONS))
+    parser.add_argument('--files', type=int, default=1000, help="quantidade de arquivos gerados")
+    parser.add_argument('--collision-rate', type=float, default=0.1, help="fração de arquivos com nome já existente no destino")
+    parser.add_argument('--depth', type=int, default=3, help="profundidade máxima das subpastas")
+    parser.add_argument('--temp-ratio', type=float, default=0.05, help="fração de arquivos temporários")
+    parser.add_argument('--empty-ratio', type=float, default=0.05, help="fração de arquivos vazios")
+    parser.add_argument('--empty-dirs', type=int, default=50, help="quantidade de pastas vazias")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--repeat', type=int, default=3, help="execuções por operação (vale a mais rápida)")
+    parser.add_argument('--output', help="grava os resultados neste arquivo JSON")
+    parser.add_argument('--compare', nargs=2, metavar=('ANTES', 'DEPOIS'), help="compara dois arquivos de resultado e sai")
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    parser.add_argument('--child-result', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        run_operation_in_child(os.path.abspath(args.script), args.child, args.child_result)
+        return
+    if args.compare:
+        compare_results(*args.compare)
+        return
+
+    script_path = os.path.abspath(args.script)
+    organizer = load_organizer(script_path)
+    operations = [op for op in args.operations if hasattr(organizer, OPERATIONS[op][0])]
+
+    tree_options = {
+        'file_count': args.files,
+        'collision_rate': args.collision_rate,
+        'depth': args.depth,
+        'temp_ratio': args.temp_ratio,
+        'empty_ratio': args.empty_ratio,
+        'empty_dir_count': args.empty_dirs,
+        'seed': args.seed,
+    }
+    results = run_benchmarks(script_path, operations, tree_options, args.repeat)
+
+    report = {
+        'script': os.path.basename(script_path),
+        'python': sys.version.split()[0],
+        'tree': tree_options,
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Resultados gravados em '{args.output}'.")
+
+
+if __name__ == "__main__":
+    main()
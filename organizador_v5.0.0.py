@@ -1,8 +1,46 @@
 import os
 import shutil
 import sys
+import errno
+import stat
 import datetime
 import time
+import asyncio
+import sqlite3
+import argparse
+import json
+import contextlib
+import hashlib
+import threading
+import queue
+import re
+import fnmatch
+import bisect
+import select
+import struct
+import ctypes
+import cProfile
+import pstats
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from collections import namedtuple, OrderedDict, deque
+
+# Dependências opcionais: Pillow é necessária só para a busca de fotos parecidas;
+# com NumPy a redução das imagens é vetorizada
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# tomllib (Python 3.11+) lê arquivos de regras em TOML; sem ele, só JSON
+try:
+    import tomllib
+except ImportError:
+    tomllib = None
 
 # Mapeamento de categorias e extensões
 FILE_CATEGORIES = {
@@ -32,11 +70,78 @@ FILE_CATEGORIES = {
     '.tar': 'Arquivos_Comuns', '.gz': 'Arquivos_Comuns', '.tgz': 'Arquivos_Comuns',
     '.bz2': 'Arquivos_Comuns', '.xz': 'Arquivos_Comuns', '.msi': 'Arquivos_Comuns',
     '.dmg': 'Arquivos_Comuns', 
+    '.tar.gz': 'Arquivos_Comuns', '.tar.bz2': 'Arquivos_Comuns', '.tar.xz': 'Arquivos_Comuns',
 }
 
 # Extensões de arquivos temporários a serem consideradas na limpeza
 TEMP_EXTENSIONS = ['.tmp', '.bak', '.~tmp', '.~bak', '.temp', '.~lock']
 
+# A limpeza processa os candidatos em lotes deste tamanho, sem nunca guardar a lista inteira
+CLEAN_BATCH_SIZE = 500
+# Lotes de candidatos que a varredura pode deixar prontos antes de a exclusão consumi-los
+CLEAN_QUEUE_BATCHES = 8
+# Quantos candidatos são mostrados na prévia antes da confirmação
+CLEAN_PREVIEW_LIMIT = 50
+
+# Movimentação entre sistemas de arquivos diferentes (ex: Downloads -> cartão SD):
+# tamanho de cada bloco copiado e quantos arquivos copiados passam por um fsync
+# conjunto antes de os originais serem apagados
+COPY_CHUNK_SIZE = 8 * 1024 * 1024
+FSYNC_BATCH_SIZE = 32
+
+# Diários de movimentação (usados por 'resume' e 'undo'): resultados gravados
+# entre dois fsync do diário e quantos diários antigos são mantidos
+JOURNAL_SYNC_BATCH = 256
+JOURNAL_KEEP = 20
+
+# Pipeline assíncrono: capacidade das filas entre as etapas e itens lidos por vez do scanner
+ASYNC_QUEUE_SIZE = 256
+ASYNC_SCAN_CHUNK = 64
+
+# Modo de observação: sufixos de downloads ainda em andamento (Chrome, Firefox, Safari, Opera),
+# segundos que tamanho e data precisam ficar parados para o arquivo ser considerado completo
+# e intervalos (s) da observação por polling, que dobra enquanto a pasta não muda
+WATCH_PARTIAL_SUFFIXES = ('.crdownload', '.part', '.partial', '.download', '.opdownload')
+WATCH_STABLE_SECONDS = 2.0
+WATCH_POLL_MIN_INTERVAL = 1.0
+WATCH_POLL_MAX_INTERVAL = 30.0
+
+# Classificação pelo conteúdo: bytes lidos do início de cada arquivo (o bastante para
+# o tipo MIME dos documentos ODF, que vai até o byte 85; continua uma única leitura)
+# e quantos resultados ficam no cache LRU (chave: inode e mtime)
+SNIFF_HEADER_SIZE = 128
+SNIFF_CACHE_SIZE = 65536
+
+# Configuração da barra de progresso: redesenhos por segundo e arquivo opcional
+# que recebe as linhas por arquivo ("Movido ...") em vez do terminal
+PROGRESS_SETTINGS = {'redraws_per_second': 4, 'log_path': None}
+
+# Bytes lidos do início e do fim de cada arquivo na pré-seleção de duplicados
+DUPLICATE_SAMPLE_SIZE = 4096
+# Tamanho do buffer reutilizado no hash completo
+DUPLICATE_READ_BUFFER = 1024 * 1024
+
+# Distância de Hamming máxima (em 64 bits) para duas fotos serem consideradas parecidas
+SIMILAR_PHOTO_THRESHOLD = 6
+
+# Registro tipado gerado pelo scanner: um por item encontrado no diretório
+ScanEntry = namedtuple('ScanEntry', ['name', 'path', 'is_dir', 'is_file', 'size', 'mtime', 'inode', 'extension'])
+
+# Número padrão de threads do motor de movimentação (as chamadas ao FUSE/sdcardfs
+# são limitadas por latência, não por CPU, então várias em paralelo ajudam)
+DEFAULT_MOVE_WORKERS = 4
+
+# Ações entregues ao pool de movimentação por thread, além das em andamento: uma
+# interrupção (Ctrl+C) só espera essas poucas, e não o resto do plano
+MOVE_SUBMIT_AHEAD = 2
+
+# Threads da varredura recursiva paralela (limpeza e pastas vazias); também passam
+# quase todo o tempo esperando o scandir/stat, então podem ser mais que os núcleos
+WALK_WORKERS = 8
+
+# Pastas de destino criadas pelo próprio organizador na raiz de Downloads
+ORGANIZER_OUTPUT_FOLDERS = ['Arquivos', 'Pastas_Organizadas', 'Organizado_Por_Data']
+
 def convert_bytes(num):
     """Converte um número de bytes para uma string legível (KB, MB, GB)."""
     for unit in ['bytes', 'KB', 'MB', 'GB', 'TB']:
@@ -50,427 +155,4142 @@ def get_downloads_path():
     """Retorna o caminho absoluto para a pasta Downloads no ambiente Termux."""
     return os.path.expanduser('~/storage/downloads')
 
-def get_file_destination_paths(file_name, base_output_folder):
+def get_app_data_path():
+    """Retorna (e cria, se preciso) a pasta de dados do organizador: índice, caches etc."""
+    base_path = os.environ.get('XDG_DATA_HOME') or os.path.expanduser('~/.local/share')
+    app_data_path = os.path.join(base_path, 'organizador')
+    os.makedirs(app_data_path, exist_ok=True)
+    return app_data_path
+
+def scan_directory(path, recursive=False, include_hidden=False, with_stat=True):
+    """
+    Percorre 'path' com os.scandir em uma única passada e gera registros ScanEntry.
+    Usa o tipo e o stat em cache de cada DirEntry, evitando chamadas extras a
+    os.path.isfile/os.path.isdir/os.path.getsize por item.
+    Com recursive=True desce nas subpastas (sem seguir links simbólicos, como o os.walk).
+    Com with_stat=False não consulta tamanho/data (size=0, mtime=0.0).
+    """
+    pending_dirs = [path]
+    while pending_dirs:
+        current_dir = pending_dirs.pop()
+        try:
+            iterator = os.scandir(current_dir)
+        except OSError as e:
+            print(f"Erro ao listar '{current_dir}': {e}")
+            continue
+
+        with iterator:
+            for entry in iterator:
+                if not include_hidden and entry.name.startswith('.'):
+                    continue
+                try:
+                    is_dir = entry.is_dir()
+                    is_file = not is_dir and entry.is_file()
+                    if with_stat:
+                        entry_stat = entry.stat()
+                        size, mtime = entry_stat.st_size, entry_stat.st_mtime
+                    else:
+                        size, mtime = 0, 0.0
+                except OSError as e:
+                    print(f"Erro ao analisar '{entry.path}': {e}")
+                    continue
+
+                extension = CLASSIFIER.extension_of(entry.name) if is_file else ''
+                yield ScanEntry(entry.name, entry.path, is_dir, is_file, size, mtime, entry.inode(), extension)
+
+                if recursive and is_dir and not entry.is_symlink():
+                    pending_dirs.append(entry.path)
+
+class ParallelWalker:
+    """
+    Varredura recursiva com os.scandir distribuída entre 'workers' threads, com roubo
+    de trabalho: cada thread tem sua própria fila (deque) de pastas, tira do fim dela
+    (a pasta mais funda, que ainda está no cache) e, quando fica sem trabalho, rouba do
+    início da fila das outras (as pastas mais rasas, com subárvores maiores).
+    Como o scandir e o stat liberam o GIL, as threads esperam o disco em paralelo, o
+    que faz diferença em armazenamento lento como o FUSE do /sdcard no Android.
+
+    Cada pasta listada é entregue, de uma vez, a todos os 'visitors' (objetos com o
+    método visit(dir_path, entries)), que assim compartilham uma única travessia.
+    'entries' são ScanEntry de todos os itens da pasta, inclusive os ocultos; tamanho e
+    data vêm do stat em cache do DirEntry e só são consultados para arquivos (pastas
+    ficam com size=0 e mtime=0.0). visit() é chamado pelas threads de varredura, em
+    qualquer ordem, então os visitantes precisam aceitar chamadas simultâneas.
+    Não segue links simbólicos para pastas, como o os.walk.
+    """
+
+    def __init__(self, workers=WALK_WORKERS, with_stat=True):
+        self.workers = max(1, workers)
+        self.with_stat = with_stat
+
+    def walk(self, root_path, visitors):
+        """Percorre 'root_path' inteira entregando cada pasta aos 'visitors'. Retorna quantas pastas foram listadas."""
+        self._visitors = tuple(visitors)
+        self._queues = [deque() for _ in range(self.workers)]
+        self._queues[0].append(root_path)
+        self._pending = 1 # Pastas na fila ou sendo listadas
+        self._listed = 0
+        self._failed = False
+        self._condition = threading.Condition()
+
+        if self.workers == 1:
+            self._work(0)
+        else:
+            with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                for future in [executor.submit(self._work, index) for index in range(self.workers)]:
+                    future.result()
+        return self._listed
+
+    def _next_dir(self, index):
+        """Próxima pasta para a thread 'index': da própria fila ou roubada de outra. None quando tudo terminou."""
+        own_queue = self._queues[index]
+        while True:
+            try:
+                return own_queue.pop()
+            except IndexError:
+                pass
+            for offset in range(1, self.workers):
+                try:
+                    return self._queues[(index + offset) % self.workers].popleft()
+                except IndexError:
+                    continue
+            with self._condition:
+                while self._pending and not self._failed and not any(self._queues):
+                    self._condition.wait()
+                if not self._pending or self._failed:
+                    return None
+
+    def _work(self, index):
+        own_queue = self._queues[index]
+        while True:
+            dir_path = self._next_dir(index)
+            if dir_path is None:
+                return
+            try:
+                entries, child_dirs = self._list(dir_path)
+                if entries is not None:
+                    # As subpastas entram na contagem antes de ficarem visíveis para roubo;
+                    # senão outra thread poderia terminá-las e zerar a contagem antes da hora
+                    with self._condition:
+                        self._pending += len(child_dirs)
+                        self._listed += 1
+                        if child_dirs:
+                            own_queue.extend(child_dirs)
+                            self._condition.notify_all()
+                    for visitor in self._visitors:
+                        visitor.visit(dir_path, entries)
+            except BaseException:
+                with self._condition:
+                    self._failed = True # Um visitante falhou: as outras threads param e o erro sobe no walk()
+                    self._condition.notify_all()
+                raise
+            with self._condition:
+                self._pending -= 1
+                if not self._pending:
+                    self._condition.notify_all()
+
+    def _list(self, dir_path):
+        """Lista uma pasta. Retorna (ScanEntry dos itens, subpastas a percorrer) ou (None, None) se não der para listar."""
+        entries = []
+        child_dirs = []
+        try:
+            iterator = os.scandir(dir_path)
+        except OSError as e:
+            print(f"Erro ao listar '{dir_path}': {e}")
+            return None, None
+        with iterator:
+            for entry in iterator:
+                try:
+                    is_dir = entry.is_dir()
+                    is_file = not is_dir and entry.is_file()
+                    if is_file and self.with_stat:
+                        entry_stat = entry.stat()
+                        size, mtime = entry_stat.st_size, entry_stat.st_mtime
+                    else:
+                        size, mtime = 0, 0.0
+                except OSError as e:
+                    print(f"Erro ao analisar '{entry.path}': {e}")
+                    is_dir = is_file = False
+                    size, mtime = 0, 0.0
+                extension = CLASSIFIER.extension_of(entry.name) if is_file else ''
+                entries.append(ScanEntry(entry.name, entry.path, is_dir, is_file, size, mtime, entry.inode(), extension))
+                if is_dir and not entry.is_symlink():
+                    child_dirs.append(entry.path)
+        return entries, child_dirs
+
+class SizeVisitor:
+    """Visitante do ParallelWalker que soma quantos arquivos e quantos bytes a varredura encontrou."""
+
+    def __init__(self):
+        self.files = 0
+        self.bytes = 0
+        self._lock = threading.Lock()
+
+    def visit(self, dir_path, entries):
+        files = [entry.size for entry in entries if entry.is_file]
+        with self._lock:
+            self.files += len(files)
+            self.bytes += sum(files)
+
+class FileClassifier:
+    """
+    Classificação de arquivos montada uma única vez a partir de FILE_CATEGORIES e
+    compartilhada por todos os modos:
+    - uma trie de sufixos invertidos, que reconhece extensões compostas (.tar.gz)
+      antes de cair na última extensão do nome;
+    - o mapa categoria -> extensões (extensions_by_category);
+    - o frozenset das pastas de destino protegidas, calculado uma vez por raiz.
+    configure() refaz tudo no lugar (ex: ao carregar um arquivo de regras).
+    """
+
+    def __init__(self, categories, default_category='Diversos'):
+        self.default_category = default_category
+        self.configure(categories)
+
+    def configure(self, categories, extra_categories=()):
+        """
+        Monta a trie e os mapas a partir de 'categories' (extensão -> categoria).
+        'extra_categories' são categorias sem extensão própria (regras por nome,
+        tamanho ou idade) cujas pastas também ficam protegidas.
+        """
+        self._categories = {extension.lower(): category for extension, category in categories.items()}
+        self._suffix_trie = {}
+        for extension in self._categories:
+            node = self._suffix_trie
+            for part in reversed(extension.lstrip('.').split('.')):
+                node = node.setdefault(part, {})
+            node[None] = extension # Marca o fim de uma extensão conhecida
+
+        extensions_by_category = {}
+        for extension, category in sorted(self._categories.items()):
+            extensions_by_category.setdefault(category, []).append(extension)
+        for category in extra_categories:
+            extensions_by_category.setdefault(category, [])
+        self.extensions_by_category = {category: tuple(extensions)
+                                       for category, extensions in extensions_by_category.items()}
+        self._protected_by_root = {}
+
+    def extension_of(self, file_name):
+        """
+        Extensão em minúsculas de 'file_name': o sufixo conhecido mais longo (.tar.gz)
+        ou, se nenhum for conhecido, a última extensão (como os.path.splitext).
+        """
+        parts = file_name.lower().lstrip('.').split('.')
+        extension = None
+        node = self._suffix_trie
+        for part in reversed(parts[1:]): # parts[0] é o nome base, nunca uma extensão
+            node = node.get(part)
+            if node is None:
+                break
+            extension = node.get(None, extension)
+        if extension is None:
+            return '.' + parts[-1] if len(parts) > 1 else ''
+        return extension
+
+    def split_extension(self, file_name):
+        """Separa 'file_name' em (nome base, extensão) preservando maiúsculas: 'a.TAR.GZ' -> ('a', '.TAR.GZ')."""
+        extension = self.extension_of(file_name)
+        if extension and file_name[-len(extension):].lower() == extension:
+            return file_name[:-len(extension)], file_name[-len(extension):]
+        return os.path.splitext(file_name)
+
+    def is_known(self, extension):
+        return extension in self._categories
+
+    def category_of_extension(self, extension):
+        return self._categories.get(extension, self.default_category)
+
+    def classify(self, file_name):
+        """Retorna (extensão, categoria) de 'file_name'."""
+        extension = self.extension_of(file_name)
+        return extension, self._categories.get(extension, self.default_category)
+
+    def classify_many(self, file_names):
+        """Classifica uma lista de nomes de uma vez; retorna a lista de (extensão, categoria) na mesma ordem."""
+        extension_of, categories, default = self.extension_of, self._categories, self.default_category
+        result = []
+        for file_name in file_names:
+            extension = extension_of(file_name)
+            result.append((extension, categories.get(extension, default)))
+        return result
+
+    @staticmethod
+    def extension_folder_name(category_name, extension):
+        """Nome da pasta de uma extensão dentro da categoria (ex: Fotos.JPG, Arquivos_Comuns.TAR.GZ)."""
+        return f"{category_name}{extension.upper()}"
+
+    def protected_paths(self, root_path):
+        """Pastas de destino do organizador sob 'root_path' que nunca são removidas, mesmo vazias."""
+        protected = self._protected_by_root.get(root_path)
+        if protected is None:
+            archive_folder = os.path.join(root_path, 'Arquivos')
+            paths = {os.path.join(root_path, folder) for folder in ORGANIZER_OUTPUT_FOLDERS}
+            paths.add(os.path.join(archive_folder, self.default_category))
+            for category_name, extensions in self.extensions_by_category.items():
+                paths.add(os.path.join(archive_folder, category_name))
+                for extension in extensions:
+                    paths.add(os.path.join(archive_folder, category_name,
+                                           self.extension_folder_name(category_name, extension)))
+            protected = frozenset(paths)
+            self._protected_by_root[root_path] = protected
+        return protected
+
+# Classificador único, usado por todos os modos
+CLASSIFIER = FileClassifier(FILE_CATEGORIES)
+
+def get_file_destination_paths(file_name, base_output_folder, extension=None, category_name=None):
     """
     Determina a categoria e os caminhos de destino para um arquivo.
+    'extension' substitui a extensão do nome (ex: a detectada pelo conteúdo) e
+    'category_name' a categoria (ex: a escolhida por uma regra do usuário).
     Retorna (categoria_folder_path, final_extension_folder_path, category_name).
     """
-    extension = os.path.splitext(file_name)[1].lower() 
-    
-    category_name = FILE_CATEGORIES.get(extension, 'Diversos') 
+    if category_name is not None:
+        extension = CLASSIFIER.extension_of(file_name) if extension is None else extension
+    elif extension is None:
+        extension, category_name = CLASSIFIER.classify(file_name)
+    else:
+        category_name = CLASSIFIER.category_of_extension(extension)
     
     category_folder_path = os.path.join(base_output_folder, category_name)
     
-    extension_folder_name = f"{category_name}{extension.upper()}" 
+    extension_folder_name = CLASSIFIER.extension_folder_name(category_name, extension)
     final_extension_folder_path = os.path.join(category_folder_path, extension_folder_name)
     
     return category_folder_path, final_extension_folder_path, category_name
 
-def organize_files_in_downloads():
+# --- Classificação pelo conteúdo (assinaturas de arquivo) ---
+
+# Extensão -> trechos (deslocamento, bytes) que precisam aparecer no cabeçalho
+# (deslocamento None: em qualquer posição dos primeiros SNIFF_HEADER_SIZE bytes).
+# As assinaturas mais específicas vêm antes das genéricas (ex: APK antes de ZIP).
+MAGIC_SIGNATURES = [
+    ('.jpg', ((0, b'\xff\xd8\xff'),)),
+    ('.png', ((0, b'\x89PNG\r\n\x1a\n'),)),
+    ('.gif', ((0, b'GIF87a'),)),
+    ('.gif', ((0, b'GIF89a'),)),
+    ('.webp', ((0, b'RIFF'), (8, b'WEBP'))),
+    ('.wav', ((0, b'RIFF'), (8, b'WAVE'))),
+    ('.avi', ((0, b'RIFF'), (8, b'AVI '))),
+    ('.tiff', ((0, b'II*\x00'),)),
+    ('.tiff', ((0, b'MM\x00*'),)),
+    ('.heic', ((4, b'ftypheic'),)),
+    ('.heic', ((4, b'ftypheix'),)),
+    ('.heic', ((4, b'ftypmif1'),)),
+    ('.mov', ((4, b'ftypqt'),)),
+    ('.3gp', ((4, b'ftyp3gp'),)),
+    ('.m4a', ((4, b'ftypM4A'),)),
+    ('.mp4', ((4, b'ftyp'),)),
+    ('.webm', ((0, b'\x1a\x45\xdf\xa3'), (None, b'\x42\x82\x84webm'))), # DocType em qualquer posição
+    ('.mkv', ((0, b'\x1a\x45\xdf\xa3'),)),
+    ('.flv', ((0, b'FLV\x01'),)),
+    ('.wmv', ((0, b'\x30\x26\xb2\x75\x8e\x66\xcf\x11'),)),
+    ('.mp3', ((0, b'ID3'),)),
+    ('.mp3', ((0, b'\xff\xfb'),)),
+    ('.mp3', ((0, b'\xff\xf3'),)),
+    ('.mp3', ((0, b'\xff\xf2'),)),
+    ('.flac', ((0, b'fLaC'),)),
+    ('.ogg', ((0, b'OggS'),)),
+    ('.pdf', ((0, b'%PDF-'),)),
+    ('.rtf', ((0, b'{\\rtf'),)),
+    ('.doc', ((0, b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1'),)),
+    # Pacotes ZIP: o nome do primeiro item (deslocamento 30) revela APKs e documentos ODF
+    ('.apk', ((0, b'PK\x03\x04'), (30, b'AndroidManifest.xml'))),
+    ('.apk', ((0, b'PK\x03\x04'), (30, b'classes.dex'))),
+    ('.odt', ((0, b'PK\x03\x04'), (30, b'mimetypeapplication/vnd.oasis.opendocument.text'))),
+    ('.ods', ((0, b'PK\x03\x04'), (30, b'mimetypeapplication/vnd.oasis.opendocument.spreadsheet'))),
+    ('.odp', ((0, b'PK\x03\x04'), (30, b'mimetypeapplication/vnd.oasis.opendocument.presentation'))),
+    ('.zip', ((0, b'PK\x03\x04'),)),
+    ('.rar', ((0, b'Rar!\x1a\x07'),)),
+    ('.7z', ((0, b'7z\xbc\xaf\x27\x1c'),)),
+    ('.gz', ((0, b'\x1f\x8b'),)),
+    ('.bz2', ((0, b'BZh'),)),
+    ('.xz', ((0, b'\xfd7zXZ\x00'),)),
+    ('.exe', ((0, b'MZ'),)),
+]
+
+def match_magic_signature(header):
+    """Retorna a extensão cuja assinatura aparece em 'header' (primeiros bytes do arquivo), ou None."""
+    for extension, parts in MAGIC_SIGNATURES:
+        if all(magic in header if offset is None else header.startswith(magic, offset) for offset, magic in parts):
+            return extension
+    return None
+
+class ContentSniffer:
     """
-    Organiza arquivos e subpastas dentro da pasta Downloads do celular
-    com base na nova estrutura de categorias.
+    Classificação opcional pelo conteúdo, para arquivos sem extensão ou com uma
+    extensão desconhecida (que iriam para 'Diversos'). Lê só os primeiros
+    SNIFF_HEADER_SIZE bytes de cada arquivo, em lote por um pool de threads, e
+    guarda o resultado (inclusive "não reconhecido") em um cache LRU limitado,
+    com chave (inode, mtime). Arquivos com extensão conhecida nunca são lidos.
     """
-    
-    source_folder = get_downloads_path()
-    output_folder = source_folder 
 
-    if not os.path.exists(source_folder):
-        print(f"Erro: A pasta de Downloads não foi encontrada em '{source_folder}'.")
-        print("Certifique-se de ter executado 'termux-setup-storage' e concedido as permissões necessárias.")
-        input("Pressione Enter para continuar.")
-        return 
+    _MISSING = object()
 
-    print(f"\n--- Analisando arquivos em '{source_folder}' ---")
+    def __init__(self, cache_size=SNIFF_CACHE_SIZE):
+        self._cache_size = cache_size
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
 
-    all_files_in_source = [f for f in os.listdir(source_folder) 
-                           if os.path.isfile(os.path.join(source_folder, f)) and not f.startswith('.')]
+    @staticmethod
+    def needs_sniffing(entry):
+        return entry.is_file and entry.size > 0 and not CLASSIFIER.is_known(entry.extension)
 
-    all_folders_in_source = [d for d in os.listdir(source_folder) 
-                             if os.path.isdir(os.path.join(source_folder, d)) and not d.startswith('.')]
-    
-    folders_to_ignore = ['Arquivos', 'Pastas_Organizadas', 'Organizado_Por_Data'] # Adicionada nova pasta de destino
-    folders_to_move = [d for d in all_folders_in_source if d not in folders_to_ignore]
+    def _cache_get(self, key):
+        with self._lock:
+            extension = self._cache.get(key, self._MISSING)
+            if extension is not self._MISSING:
+                self._cache.move_to_end(key)
+            return extension
 
-    if not all_files_in_source and not folders_to_move:
-        print("Nenhum arquivo ou pasta para organizar encontrado na pasta Downloads.")
-        input("Pressione Enter para continuar.")
-        return
+    def _cache_put(self, key, extension):
+        with self._lock:
+            self._cache[key] = extension
+            self._cache.move_to_end(key)
+            if len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
 
-    print("\nArquivos detectados para organização por categoria:")
-    for file_name in all_files_in_source:
-        _, final_path, category = get_file_destination_paths(file_name, os.path.join(output_folder, "Arquivos"))
-        print(f"- {file_name} -> Categoria: {category} -> {os.path.basename(os.path.dirname(final_path))}/{os.path.basename(final_path)}/")
-    
-    if folders_to_move:
-        print("\nPasta(s) detectada(s) para organização por categoria:")
-        for folder_name in folders_to_move:
-            print(f"- {folder_name}/ -> Pastas_Organizadas/")
+    @staticmethod
+    def _read_and_match(file_path):
+        try:
+            with open(file_path, 'rb', buffering=0) as f:
+                return match_magic_signature(f.read(SNIFF_HEADER_SIZE))
+        except OSError:
+            return None
 
-    confirmacao = input("\nDigite 'confirmar' para iniciar a organização por categoria: ").strip().lower()
+    def sniff(self, entry):
+        """Extensão detectada pelo conteúdo de 'entry' (ScanEntry), ou None se não precisa ou não reconheceu."""
+        if not self.needs_sniffing(entry):
+            return None
+        key = (entry.inode, entry.mtime)
+        extension = self._cache_get(key)
+        if extension is self._MISSING:
+            extension = self._read_and_match(entry.path)
+            self._cache_put(key, extension)
+        return extension
 
-    if confirmacao != 'confirmar':
-        print("Organização por categoria cancelada. Nada foi modificado.")
-        input("Pressione Enter para continuar.")
-        return
+    def sniff_many(self, entries, workers=DEFAULT_MOVE_WORKERS):
+        """Retorna {caminho: extensão} dos arquivos de 'entries' reconhecidos pelo conteúdo, lendo os cabeçalhos em paralelo."""
+        found = {}
+        misses = []
+        for entry in entries:
+            if not self.needs_sniffing(entry):
+                continue
+            extension = self._cache_get((entry.inode, entry.mtime))
+            if extension is self._MISSING:
+                misses.append(entry)
+            elif extension is not None:
+                found[entry.path] = extension
 
-    print("\nIniciando organização por categoria...")
+        if misses:
+            with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+                extensions = executor.map(self._read_and_match, [entry.path for entry in misses])
+                for entry, extension in zip(misses, extensions):
+                    self._cache_put((entry.inode, entry.mtime), extension)
+                    if extension is not None:
+                        found[entry.path] = extension
+        return found
 
-    total_items = len(all_files_in_source) + len(folders_to_move)
-    processed_items = 0
-    moved_files_count = {} 
-    moved_folders_count = 0 
+# Detector único: o cache vale para todas as operações da sessão (e para todo o modo de observação)
+SNIFFER = ContentSniffer()
 
-    main_archive_folder = os.path.join(output_folder, "Arquivos")
-    os.makedirs(main_archive_folder, exist_ok=True)
+# --- Regras de categoria configuráveis (arquivo TOML/JSON do usuário) ---
 
-    organized_folders_base_path = os.path.join(output_folder, "Pastas_Organizadas")
-    os.makedirs(organized_folders_base_path, exist_ok=True)
+# Nomes procurados na pasta de dados quando --rules não é informado
+RULES_FILE_NAMES = ('regras.toml', 'regras.json')
+# Versão do formato gravado no cache de regras compiladas
+RULES_CACHE_VERSION = 1
 
-    for folder_name in folders_to_move:
-        source_path_folder = os.path.join(source_folder, folder_name)
-        destination_path_folder = os.path.join(organized_folders_base_path, folder_name)
-        
-        try:
-            shutil.move(source_path_folder, destination_path_folder)
-            print(f"Movido pasta: '{folder_name}' para '{os.path.basename(organized_folders_base_path)}/'")
-            processed_items += 1
-            moved_folders_count += 1 
-        except Exception as e:
-            print(f"Erro ao mover pasta '{folder_name}': {e}")
-            processed_items += 1 
-        
-        if total_items > 0:
-            progress_percent = (processed_items / total_items) * 100
-            sys.stdout.write(f"\rProgresso: {progress_percent:.1f}% ({processed_items}/{total_items} itens)")
-            sys.stdout.flush()
+_RULE_KEYS = {'category', 'extensions', 'glob', 'regex', 'min_size', 'max_size', 'min_age_days', 'max_age_days'}
+_SIZE_PATTERN = re.compile(r'^\s*(\d+(?:\.\d+)?)\s*([kmgt]?)i?b?\s*$', re.IGNORECASE)
+_SIZE_MULTIPLIERS = {'': 1, 'k': 1024, 'm': 1024 ** 2, 'g': 1024 ** 3, 't': 1024 ** 4}
 
-    for file_name in all_files_in_source:
-        source_path_file = os.path.join(source_folder, file_name)
-        
-        if file_name.startswith('.'): 
-            processed_items += 1
-            continue
+# Uma regra normalizada: extensões (tupla ou None), padrão de nome (regex já
+# ancorada no início, ou None), faixa de tamanho em bytes e de idade em segundos
+Rule = namedtuple('Rule', ['index', 'category', 'extensions', 'pattern', 'min_size', 'max_size', 'min_age', 'max_age'])
 
-        category_base_path, final_extension_folder_path, category_name = get_file_destination_paths(file_name, main_archive_folder)
-        
-        os.makedirs(category_base_path, exist_ok=True)
-        os.makedirs(final_extension_folder_path, exist_ok=True)
+def _parse_size(value, where):
+    """Converte 500, "10MB" ou "1.5 GiB" em bytes."""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return int(value)
+    match = _SIZE_PATTERN.match(str(value))
+    if not match:
+        raise ValueError(f"{where}: tamanho inválido '{value}'")
+    return int(float(match.group(1)) * _SIZE_MULTIPLIERS[match.group(2).lower()])
 
-        destination_path_file = os.path.join(final_extension_folder_path, file_name)
+def compile_rules_spec(data):
+    """
+    Valida e normaliza o conteúdo de um arquivo de regras:
+    'temp_extensions' (substitui TEMP_EXTENSIONS) e 'rules', lista de regras com
+    'category' e uma ou mais condições: 'extensions', 'glob' ou 'regex' (no nome,
+    sem diferenciar maiúsculas), 'min_size'/'max_size' e 'min_age_days'/'max_age_days'.
+    Retorna um dicionário serializável em JSON, pronto para CategoryRules.
+    Erros de formato levantam ValueError.
+    """
+    if not isinstance(data, dict):
+        raise ValueError("o arquivo de regras deve ser um objeto/tabela")
+    unknown = set(data) - {'temp_extensions', 'rules'}
+    if unknown:
+        raise ValueError(f"chaves desconhecidas: {', '.join(sorted(unknown))}")
 
-        if os.path.exists(destination_path_file):
-            base_name = os.path.splitext(file_name)[0]
-            extension = os.path.splitext(file_name)[1]
-            suffix = 1
-            new_file_name = f"{base_name}_{suffix}{extension}"
-            while os.path.exists(os.path.join(final_extension_folder_path, new_file_name)):
-                suffix += 1
-                new_file_name = f"{base_name}_{suffix}{extension}"
-            destination_path_file = os.path.join(final_extension_folder_path, new_file_name)
-            print(f"\nConflito: '{file_name}' renomeado para '{new_file_name}'") 
+    def normalize_extension(extension):
+        extension = extension.strip().lower()
+        return extension if extension.startswith('.') else '.' + extension
 
-        try:
-            shutil.move(source_path_file, destination_path_file)
-            print(f"\nMovido arquivo: '{file_name}' para '{os.path.basename(category_base_path)}/{os.path.basename(final_extension_folder_path)}/'")
-            processed_items += 1
-            moved_files_count[category_name] = moved_files_count.get(category_name, 0) + 1
-        except Exception as e:
-            print(f"\nErro ao mover arquivo '{file_name}': {e}")
-            processed_items += 1
-        
-        if total_items > 0:
-            progress_percent = (processed_items / total_items) * 100
-            sys.stdout.write(f"\rProgresso: {progress_percent:.1f}% ({processed_items}/{total_items} itens)")
-            sys.stdout.flush()
+    def extension_list(value, where):
+        """Uma extensão (texto) ou uma lista delas; qualquer outra coisa é erro de formato."""
+        if isinstance(value, str):
+            value = [value]
+        if not isinstance(value, list) or not all(isinstance(extension, str) and extension.strip()
+                                                  for extension in value):
+            raise ValueError(f"{where}: deve ser uma extensão ou uma lista de extensões (texto)")
+        return [normalize_extension(extension) for extension in value]
 
-    print("\n\nOrganização por categoria concluída com sucesso!")
-    print(f"Total de {processed_items} itens processados na pasta Downloads.")
+    temp_extensions = data.get('temp_extensions')
+    if temp_extensions is not None:
+        temp_extensions = extension_list(temp_extensions, "'temp_extensions'")
 
-    print("\n--- Resumo da Organização por Categoria ---")
-    if moved_folders_count > 0:
-        print(f"Pastas movidas para 'Pastas_Organizadas/': {moved_folders_count}")
-    
-    if moved_files_count:
-        print("Arquivos movidos por categoria:")
-        for category, count in sorted(moved_files_count.items()):
-            print(f"- {category}: {count} arquivos")
+    rules = []
+    for index, raw_rule in enumerate(data.get('rules', [])):
+        where = f"regra {index + 1}"
+        if not isinstance(raw_rule, dict) or not raw_rule.get('category'):
+            raise ValueError(f"{where}: 'category' é obrigatória")
+        unknown = set(raw_rule) - _RULE_KEYS
+        if unknown:
+            raise ValueError(f"{where}: chaves desconhecidas: {', '.join(sorted(unknown))}")
+        if 'glob' in raw_rule and 'regex' in raw_rule:
+            raise ValueError(f"{where}: use 'glob' ou 'regex', não os dois")
+        if len(raw_rule) == 1:
+            raise ValueError(f"{where}: a regra não tem nenhuma condição")
+        category = raw_rule['category']
+        # A categoria vira o nome de uma pasta dentro de 'Arquivos/': nada de subpastas nem de sair dela
+        if (not isinstance(category, str) or not category.strip() or category in ('.', '..')
+                or any(sep in category for sep in (os.sep, os.altsep, '\0') if sep)):
+            raise ValueError(f"{where}: 'category' deve ser um nome de pasta simples, sem '{os.sep}' e sem '..'")
+
+        extensions = raw_rule.get('extensions')
+        if extensions is not None:
+            extensions = sorted(set(extension_list(extensions, f"{where}: 'extensions'")))
+
+        pattern = None
+        if 'glob' in raw_rule:
+            pattern = fnmatch.translate(str(raw_rule['glob']))
+        elif 'regex' in raw_rule:
+            pattern = str(raw_rule['regex'])
+            if re.search(r'\\[1-9]', pattern):
+                raise ValueError(f"{where}: use grupos nomeados em vez de referências numeradas")
+            try:
+                re.compile(pattern)
+            except re.error as e:
+                raise ValueError(f"{where}: regex inválida: {e}")
+            # Busca em qualquer posição, mas ancorada no início para a alternância combinada
+            pattern = f".*?(?:{pattern})"
+
+        days = 86400
+        rules.append({
+            'category': category,
+            'extensions': extensions,
+            'pattern': pattern,
+            'min_size': _parse_size(raw_rule['min_size'], where) if 'min_size' in raw_rule else None,
+            'max_size': _parse_size(raw_rule['max_size'], where) if 'max_size' in raw_rule else None,
+            'min_age': float(raw_rule['min_age_days']) * days if 'min_age_days' in raw_rule else None,
+            'max_age': float(raw_rule['max_age_days']) * days if 'max_age_days' in raw_rule else None,
+        })
+
+    return {'version': RULES_CACHE_VERSION, 'temp_extensions': temp_extensions, 'rules': rules}
+
+class CategoryRules:
+    """
+    Regras do usuário compiladas para classificar milhares de arquivos rapidamente.
+    Vale a primeira regra (na ordem do arquivo) que casar; a busca é feita em três etapas:
+    1. extensão: um dicionário por sufixo do nome (.gz, .tar.gz...), só com as regras que têm 'extensions';
+    2. nome: uma única regex com todos os 'glob'/'regex' em alternância, na ordem das regras;
+    3. as regras só de tamanho/idade.
+    Cada etapa só procura regras anteriores à melhor já encontrada.
+    Sem regras carregadas, match() retorna None e vale a classificação padrão.
+    """
+
+    _FLAGS = re.IGNORECASE | re.DOTALL
+
+    def __init__(self, spec=None):
+        self.configure(spec or {'temp_extensions': None, 'rules': []})
+
+    def configure(self, spec):
+        self.temp_extensions = spec['temp_extensions']
+        self._rules = [Rule(index, rule['category'], tuple(rule['extensions']) if rule['extensions'] else None,
+                            rule['pattern'], rule['min_size'], rule['max_size'], rule['min_age'], rule['max_age'])
+                       for index, rule in enumerate(spec['rules'])]
+        self.categories = tuple(sorted({rule.category for rule in self._rules}))
+
+        self._by_extension = {}
+        self.extension_categories = {} # Regras só de extensão: entram também no classificador padrão
+        for rule in self._rules:
+            for extension in rule.extensions or ():
+                self._by_extension.setdefault(extension, []).append(rule)
+                if all(value is None for value in rule[3:]): # Sem padrão de nome, tamanho ou idade
+                    self.extension_categories.setdefault(extension, rule.category)
+
+        self._patterns = {rule.index: re.compile(rule.pattern, self._FLAGS)
+                          for rule in self._rules if rule.pattern is not None}
+        self._pattern_rules = [rule for rule in self._rules if rule.extensions is None and rule.pattern is not None]
+        self._combined = None
+        if self._pattern_rules:
+            try:
+                self._combined = re.compile('|'.join(f"(?P<regra_{rule.index}>{rule.pattern})"
+                                                     for rule in self._pattern_rules), self._FLAGS)
+            except re.error:
+                pass # Ex: o mesmo nome de grupo em duas regras; cada padrão é testado separadamente
+        self._predicate_rules = [rule for rule in self._rules if rule.extensions is None and rule.pattern is None]
+
+    def _predicates_hold(self, rule, entry, now):
+        if rule.pattern is not None and rule.extensions is not None and not self._patterns[rule.index].match(entry.name):
+            return False
+        if rule.min_size is not None and entry.size < rule.min_size:
+            return False
+        if rule.max_size is not None and entry.size > rule.max_size:
+            return False
+        if rule.min_age is not None or rule.max_age is not None:
+            age = now - entry.mtime
+            if rule.min_age is not None and age < rule.min_age:
+                return False
+            if rule.max_age is not None and age > rule.max_age:
+                return False
+        return True
+
+    def match(self, entry, now=None):
+        """Categoria da primeira regra que casa com 'entry' (ScanEntry de um arquivo), ou None."""
+        if not self._rules or not entry.is_file:
+            return None
+        now = time.time() if now is None else now
+        best = len(self._rules) # Índice da melhor regra encontrada até agora
+
+        # 1. Todos os sufixos do nome, do mais longo ao mais curto (o nome base nunca conta)
+        if self._by_extension:
+            name = entry.name.lower().lstrip('.')
+            dot = name.find('.', 1)
+            while dot != -1:
+                for rule in self._by_extension.get(name[dot:], ()):
+                    if rule.index >= best:
+                        break
+                    if self._predicates_hold(rule, entry, now):
+                        best = rule.index
+                        break
+                dot = name.find('.', dot + 1)
+
+        # 2. Alternância combinada: o primeiro grupo que casa é a regra de menor índice.
+        # Se as condições de tamanho/idade dela falharem, as regras seguintes são testadas uma a uma.
+        if self._pattern_rules and self._pattern_rules[0].index < best:
+            first = 0
+            if self._combined is not None:
+                found = self._combined.match(entry.name)
+                first = int(found.lastgroup[len('regra_'):]) if found else best
+            for rule in self._pattern_rules:
+                if rule.index < first:
+                    continue
+                if rule.index >= best:
+                    break
+                if (rule.index == first and self._combined is not None
+                        or self._patterns[rule.index].match(entry.name)) and self._predicates_hold(rule, entry, now):
+                    best = rule.index
+                    break
+
+        # 3. Regras só de tamanho/idade
+        for rule in self._predicate_rules:
+            if rule.index >= best:
+                break
+            if self._predicates_hold(rule, entry, now):
+                best = rule.index
+                break
+
+        return self._rules[best].category if best < len(self._rules) else None
+
+# Regras ativas (vazias até apply_rules)
+RULES = CategoryRules()
+
+def load_rules_file(file_path):
+    """
+    Lê um arquivo de regras (TOML ou JSON) e retorna a especificação compilada.
+    O resultado fica em cache na pasta de dados, com chave no hash do conteúdo do arquivo,
+    então a validação e a tradução dos padrões só acontecem quando o arquivo muda.
+    """
+    with open(file_path, 'rb') as rules_file:
+        content = rules_file.read()
+    content_hash = hashlib.blake2b(content, digest_size=16).hexdigest()
+    cache_path = os.path.join(get_app_data_path(), 'regras_compiladas.json')
+
+    try:
+        with open(cache_path, encoding='utf-8') as cache_file:
+            cached = json.load(cache_file)
+        if cached.get('hash') == content_hash and cached['spec'].get('version') == RULES_CACHE_VERSION:
+            return cached['spec']
+    except (OSError, ValueError, KeyError, AttributeError):
+        pass
+
+    if file_path.endswith('.toml'):
+        if tomllib is None:
+            raise ValueError("arquivos TOML precisam do Python 3.11+; use JSON")
+        data = tomllib.loads(content.decode('utf-8'))
     else:
-        print("Nenhum arquivo foi movido por categoria.")
-    print("------------------------------------------")
+        data = json.loads(content.decode('utf-8'))
+    spec = compile_rules_spec(data)
 
-    input("Pressione Enter para continuar.")
+    try:
+        with open(cache_path, 'w', encoding='utf-8') as cache_file:
+            json.dump({'hash': content_hash, 'spec': spec}, cache_file, ensure_ascii=False)
+    except OSError:
+        pass # Sem cache, as regras só são recompiladas na próxima execução
+    return spec
+
+def find_rules_file():
+    """Caminho do arquivo de regras na pasta de dados, se houver um."""
+    for file_name in RULES_FILE_NAMES:
+        file_path = os.path.join(get_app_data_path(), file_name)
+        if os.path.isfile(file_path):
+            return file_path
+    return None
+
+def apply_rules(spec):
+    """Ativa as regras compiladas em todos os modos: classificador, pastas protegidas e extensões temporárias."""
+    RULES.configure(spec)
+    categories = dict(FILE_CATEGORIES)
+    categories.update(RULES.extension_categories)
+    CLASSIFIER.configure(categories, RULES.categories)
+    if RULES.temp_extensions is not None:
+        TEMP_EXTENSIONS[:] = RULES.temp_extensions
 
 
-def clean_files():
+# --- Índice persistente da varredura ---
+
+def open_scan_index(db_path=None):
     """
-    Identifica e oferece para remover arquivos vazios e temporários
-    dentro da pasta Downloads e suas subfolders organizadas.
+    Abre (criando, se necessário) o índice SQLite da varredura.
+    'dirs' guarda o mtime/inode de cada pasta já varrida; 'entries' guarda os itens
+    de cada pasta com tamanho, mtime, inode e a classificação calculada.
     """
-    downloads_path = get_downloads_path()
-    
-    files_to_clean = []
-    total_size_to_clean = 0 
+    if db_path is None:
+        db_path = os.path.join(get_app_data_path(), 'indice.sqlite3')
+    conn = sqlite3.connect(db_path)
+    conn.executescript("""
+        PRAGMA journal_mode=WAL;
+        PRAGMA synchronous=NORMAL;
+        CREATE TABLE IF NOT EXISTS dirs (
+            path TEXT PRIMARY KEY,
+            parent TEXT NOT NULL,
+            mtime_ns INTEGER NOT NULL,
+            inode INTEGER NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS dirs_parent ON dirs(parent);
+        CREATE TABLE IF NOT EXISTS entries (
+            path TEXT PRIMARY KEY,
+            parent TEXT NOT NULL,
+            name TEXT NOT NULL,
+            is_dir INTEGER NOT NULL,
+            size INTEGER NOT NULL,
+            mtime REAL NOT NULL,
+            inode INTEGER NOT NULL,
+            extension TEXT NOT NULL,
+            category TEXT
+        );
+        CREATE INDEX IF NOT EXISTS entries_parent ON entries(parent);
+        CREATE TABLE IF NOT EXISTS hashes (
+            inode INTEGER NOT NULL,
+            size INTEGER NOT NULL,
+            mtime REAL NOT NULL,
+            sample_hash TEXT,
+            full_hash TEXT,
+            PRIMARY KEY (inode, size, mtime)
+        );
+        CREATE TABLE IF NOT EXISTS photo_hashes (
+            inode INTEGER NOT NULL,
+            size INTEGER NOT NULL,
+            mtime REAL NOT NULL,
+            dhash INTEGER NOT NULL,
+            PRIMARY KEY (inode, size, mtime)
+        );
+    """)
+    return conn
 
-    print(f"\n--- Analisando arquivos para limpeza em '{downloads_path}' ---")
+def _forget_index_subtree(conn, dir_path):
+    """Remove do índice uma pasta e tudo o que estava abaixo dela."""
+    lower, upper = dir_path + os.sep, dir_path + chr(ord(os.sep) + 1)
+    conn.execute("DELETE FROM dirs WHERE path = ? OR (path >= ? AND path < ?)", (dir_path, lower, upper))
+    conn.execute("DELETE FROM entries WHERE path = ? OR (path >= ? AND path < ?)", (dir_path, lower, upper))
+
+def refresh_scan_index(conn, root_path):
+    """
+    Atualiza o índice a partir de 'root_path'. Só relista as pastas cujo mtime/inode
+    mudou desde a última execução; nas demais, reaproveita os itens já indexados e
+    apenas confere as subpastas. Retorna (pastas_relistadas, pastas_reaproveitadas).
+    """
+    known_dirs = {}
+    children_of = {}
+    for path, parent, mtime_ns, inode in conn.execute("SELECT path, parent, mtime_ns, inode FROM dirs"):
+        known_dirs[path] = (mtime_ns, inode)
+        children_of.setdefault(parent, []).append(path)
+
+    # Pastas alteradas no mesmo instante da varredura podem mudar de novo sem alterar
+    # o mtime (granularidade do sistema de arquivos); essas são marcadas para relistagem.
+    scan_started_ns = time.time_ns() - 2_000_000_000
+    rescanned, reused = 0, 0
 
-    for root, _, files in os.walk(downloads_path):
-        for file_name in files:
-            file_path = os.path.join(root, file_name)
+    with conn:
+        pending_dirs = [root_path]
+        while pending_dirs:
+            dir_path = pending_dirs.pop()
             try:
-                file_size = os.path.getsize(file_path)
-                file_ext = os.path.splitext(file_name)[1].lower()
-
-                if file_size == 0:
-                    files_to_clean.append((file_path, "Vazio", file_size))
-                elif file_ext in TEMP_EXTENSIONS:
-                    files_to_clean.append((file_path, f"Temporário ({file_ext})", file_size))
-                
-            except Exception as e:
-                print(f"Erro ao analisar '{file_path}': {e}")
+                dir_stat = os.stat(dir_path)
+            except OSError:
+                _forget_index_subtree(conn, dir_path)
+                continue
 
-    if not files_to_clean:
-        print("Nenhum arquivo vazio ou temporário encontrado para limpeza.")
-        input("Pressione Enter para continuar.")
-        return
+            if known_dirs.get(dir_path) == (dir_stat.st_mtime_ns, dir_stat.st_ino):
+                reused += 1
+                pending_dirs.extend(children_of.get(dir_path, []))
+                continue
 
-    print("\n--- Arquivos detectados para limpeza: ---")
-    for i, (f_path, reason, f_size) in enumerate(files_to_clean):
-        relative_path = os.path.relpath(f_path, downloads_path)
-        print(f"{i+1}. {relative_path} (Motivo: {reason}, Tamanho: {convert_bytes(f_size)})")
-        total_size_to_clean += f_size 
+            rescanned += 1
+            entries = list(scan_directory(dir_path, include_hidden=True))
+            current_names = {e.name for e in entries}
+            for old_dir in children_of.get(dir_path, []):
+                if os.path.basename(old_dir) not in current_names:
+                    _forget_index_subtree(conn, old_dir)
 
-    print(f"\nTotal de {len(files_to_clean)} arquivos a serem removidos, totalizando {convert_bytes(total_size_to_clean)}.")
-    
-    confirmacao = input("\nDigite 'limpar' para confirmar a exclusão: ").strip().lower()
+            conn.execute("DELETE FROM entries WHERE parent = ?", (dir_path,))
+            conn.executemany(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(e.path, dir_path, e.name, int(e.is_dir), e.size, e.mtime, e.inode, e.extension,
+                  (RULES.match(e) or CLASSIFIER.category_of_extension(e.extension)) if e.is_file else None)
+                 for e in entries]
+            )
+            stored_mtime_ns = dir_stat.st_mtime_ns if dir_stat.st_mtime_ns < scan_started_ns else -1
+            parent = os.path.dirname(dir_path) if dir_path != root_path else ''
+            conn.execute("INSERT OR REPLACE INTO dirs VALUES (?, ?, ?, ?)",
+                         (dir_path, parent, stored_mtime_ns, dir_stat.st_ino))
+            pending_dirs.extend(e.path for e in entries if e.is_dir)
 
-    if confirmacao != 'limpar':
-        print("Limpeza cancelada. Nada foi removido.")
-        input("Pressione Enter para continuar.")
-        return
+    return rescanned, reused
 
-    print("\nIniciando limpeza...")
-    removed_count = 0
-    removed_size_total = 0 
+def query_cleanup_candidates(conn, root_path):
+    """Retorna (caminho, motivo, tamanho) dos arquivos vazios ou temporários indexados sob 'root_path'."""
+    placeholders = ', '.join('?' for _ in TEMP_EXTENSIONS)
+    rows = conn.execute(
+        f"SELECT path, size, extension FROM entries WHERE is_dir = 0 AND (path >= ? AND path < ?) "
+        f"AND (size = 0 OR extension IN ({placeholders})) ORDER BY path",
+        (root_path + os.sep, root_path + chr(ord(os.sep) + 1), *TEMP_EXTENSIONS)
+    )
+    return [(path, "Vazio" if size == 0 else f"Temporário ({ext})", size) for path, size, ext in rows]
+
+def query_organize_candidates(conn, root_path):
+    """Retorna (nome, é_pasta, categoria) dos itens soltos na raiz que seriam organizados."""
+    rows = conn.execute(
+        "SELECT name, is_dir, category FROM entries WHERE parent = ? ORDER BY is_dir DESC, name",
+        (root_path,)
+    )
+    return [(name, bool(is_dir), category) for name, is_dir, category in rows
+            if not name.startswith('.') and not (is_dir and name in ORGANIZER_OUTPUT_FOLDERS)]
+
+# --- Perfil de desempenho (--profile) ---
+
+# Categorias de chamadas de sistema medidas pelo --profile -> funções do módulo os
+PROFILE_SYSCALL_CATEGORIES = {
+    'listagem': ('scandir', 'listdir'),
+    'stat': ('stat', 'lstat'),
+    'criar pasta': ('mkdir',),
+    'renomear': ('rename', 'replace'),
+    'remover': ('remove', 'unlink', 'rmdir'),
+    'abrir': ('open',),
+    'fsync': ('fsync',),
+    'cópia': ('copy_file_range', 'sendfile'),
+}
+
+class _ProfilePhase:
+    """Contexto que mede uma execução de uma fase (usado só com o perfil ligado)."""
+    __slots__ = ('_profiler', '_name', '_start')
+
+    def __init__(self, profiler, name):
+        self._profiler = profiler
+        self._name = name
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._profiler._record(self._profiler.phases, self._name, self._start, trace=True)
+
+class _TimedScandir:
+    """Iterador do os.scandir que soma ao tempo de listagem o gasto em cada leitura de entradas."""
+    __slots__ = ('_iterator', '_profiler')
 
-    for f_path, _, f_size in files_to_clean:
+    def __init__(self, iterator, profiler):
+        self._iterator = iterator
+        self._profiler = profiler
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self._iterator.close()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        start = time.perf_counter()
         try:
-            os.remove(f_path)
-            print(f"Removido: {os.path.relpath(f_path, downloads_path)}")
-            removed_count += 1
-            removed_size_total += f_size
-        except Exception as e:
-            print(f"Erro ao remover '{os.path.relpath(f_path, downloads_path)}': {e}")
-    
-    print(f"\nLimpeza concluída! {removed_count} arquivos foram removidos.")
-    print(f"Espaço total liberado: {convert_bytes(removed_size_total)}.")
-    input("Pressione Enter para continuar.")
+            return next(self._iterator)
+        finally:
+            self._profiler._record(self._profiler.syscalls, 'listagem', start, calls=0)
 
+    def close(self):
+        self._iterator.close()
 
-def remove_empty_folders():
+class Profiler:
     """
-    Identifica e oferece para remover pastas vazias dentro da pasta Downloads e suas subpastas.
-    Exclui pastas de destino do próprio organizador.
+    Cronômetros por fase, contadores e medição das chamadas de sistema para o --profile.
+    Desligado (o padrão), phase() devolve sempre o mesmo contexto vazio e count() só
+    confere um atributo: nada é medido nem interceptado. Ligado, acumula chamadas e
+    tempo de cada fase (somando as threads), troca as funções de PROFILE_SYSCALL_CATEGORIES
+    por versões cronometradas e, se pedido, guarda cada fase como evento do trace JSON.
     """
-    downloads_path = get_downloads_path()
-    empty_folders_found = []
 
-    print(f"\n--- Analisando pastas vazias em '{downloads_path}' ---")
+    def __init__(self):
+        self.enabled = False
+        self.phases = {}    # nome -> [chamadas, segundos]
+        self.syscalls = {}  # categoria -> [chamadas, segundos]
+        self.counters = {}
+        self._trace = None
+        self._originals = {}
+        self._lock = threading.Lock()
+        self._started_at = 0.0
+        self.wall_seconds = 0.0
 
-    folders_to_protect = [
-        os.path.join(downloads_path, 'Arquivos'),
-        os.path.join(downloads_path, 'Pastas_Organizadas'),
-        os.path.join(downloads_path, 'Organizado_Por_Data') # Adicionada nova pasta de destino
-    ]
-    main_archive_folder = os.path.join(downloads_path, "Arquivos")
-    for category_name in set(FILE_CATEGORIES.values()): 
-        folders_to_protect.append(os.path.join(main_archive_folder, category_name))
-        for ext in [k for k, v in FILE_CATEGORIES.items() if v == category_name]:
-             folders_to_protect.append(os.path.join(main_archive_folder, category_name, f"{category_name}{ext.upper()}"))
-    folders_to_protect.append(os.path.join(main_archive_folder, 'Diversos'))
-    for ext in sorted(set(FILE_CATEGORIES.keys())): 
-        if FILE_CATEGORIES.get(ext) == 'Diversos' or ext not in FILE_CATEGORIES:
-             folders_to_protect.append(os.path.join(main_archive_folder, 'Diversos', f"Diversos{ext.upper()}"))
-
-
-    for root, dirs, files in os.walk(downloads_path, topdown=False):
-        if not files and not dirs:
-            if root not in folders_to_protect:
-                empty_folders_found.append(root)
+    def start(self, trace=False):
+        """Zera as medições, instala os contadores no módulo os e liga as fases."""
+        self.phases, self.syscalls, self.counters = {}, {}, {}
+        self._trace = [] if trace else None
+        for category, names in PROFILE_SYSCALL_CATEGORIES.items():
+            for name in names:
+                original = getattr(os, name, None)
+                if original is not None:
+                    self._originals[name] = original
+                    setattr(os, name, self._timed_syscall(original, category, name == 'scandir'))
+        self._started_at = time.perf_counter()
+        self.enabled = True
 
-    if not empty_folders_found:
-        print("Nenhuma pasta vazia encontrada para remoção.")
-        input("Pressione Enter para continuar.")
-        return
+    def stop(self):
+        """Desliga as fases e devolve as funções originais ao módulo os."""
+        self.enabled = False
+        self.wall_seconds = time.perf_counter() - self._started_at
+        for name, original in self._originals.items():
+            setattr(os, name, original)
+        self._originals = {}
 
-    print("\n--- Pastas vazias detectadas para remoção: ---")
-    for i, folder_path in enumerate(empty_folders_found):
-        relative_path = os.path.relpath(folder_path, downloads_path)
-        print(f"{i+1}. {relative_path}/")
+    def _timed_syscall(self, original, category, wraps_iterator):
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                result = original(*args, **kwargs)
+            finally:
+                self._record(self.syscalls, category, start)
+            return _TimedScandir(result, self) if wraps_iterator else result
+        return timed
 
-    confirmacao = input("\nDigite 'remover' para confirmar a exclusão destas pastas: ").strip().lower()
+    def _record(self, table, name, start, calls=1, trace=False):
+        end = time.perf_counter()
+        with self._lock:
+            totals = table.get(name)
+            if totals is None:
+                totals = table[name] = [0, 0.0]
+            totals[0] += calls
+            totals[1] += end - start
+            if trace and self._trace is not None:
+                self._trace.append((name, start, end, threading.get_ident()))
 
-    if confirmacao != 'remover':
-        print("Remoção de pastas vazias cancelada. Nada foi removido.")
-        input("Pressione Enter para continuar.")
-        return
+    def phase(self, name):
+        """Contexto que cronometra a fase 'name' (vazio, sem custo, com o perfil desligado)."""
+        if not self.enabled:
+            return _NULL_PHASE
+        return _ProfilePhase(self, name)
 
-    print("\nIniciando remoção de pastas vazias...")
-    removed_count = 0
-    for folder_path in empty_folders_found:
-        try:
-            os.rmdir(folder_path) 
-            print(f"Removido: {os.path.relpath(folder_path, downloads_path)}/")
-            removed_count += 1
-        except Exception as e:
-            print(f"Erro ao remover '{os.path.relpath(folder_path, downloads_path)}/': {e}")
-    
-    print(f"\nRemoção de pastas vazias concluída! {removed_count} pastas foram removidas.")
-    input("Pressione Enter para continuar.")
+    def count(self, name, amount=1):
+        """Soma 'amount' ao contador 'name' (ignorado com o perfil desligado)."""
+        if self.enabled:
+            with self._lock:
+                self.counters[name] = self.counters.get(name, 0) + amount
+
+    def as_dict(self):
+        """Medições em forma serializável (para o resumo em JSON)."""
+        def table(rows):
+            return {name: {'calls': calls, 'seconds': round(seconds, 6)} for name, (calls, seconds) in rows.items()}
+        return {'wall_seconds': round(self.wall_seconds, 6), 'phases': table(self.phases),
+                'syscalls': table(self.syscalls), 'counters': dict(self.counters)}
+
+    def report(self, stream):
+        """Imprime as tabelas de fases, chamadas de sistema e contadores."""
+        wall = max(self.wall_seconds, 1e-9)
+
+        def print_table(title, rows):
+            print(f"\n{title:<22} | {'chamadas':>9} | {'tempo (s)':>10} | {'% do total':>10}", file=stream)
+            print("-" * 61, file=stream)
+            for name, (calls, seconds) in sorted(rows.items(), key=lambda item: -item[1][1]):
+                print(f"{name:<22} | {calls:>9} | {seconds:>10.4f} | {seconds / wall * 100:>9.1f}%", file=stream)
 
+        print(f"\n--- Perfil de desempenho: {self.wall_seconds:.3f}s no total ---", file=stream)
+        print_table("fase", self.phases)
+        print_table("chamadas de sistema", self.syscalls)
+        if self.counters:
+            print("\ncontadores:", file=stream)
+            for name, value in sorted(self.counters.items()):
+                print(f"- {name}: {value}", file=stream)
+        print("\nFases executadas nas threads de movimentação somam o tempo de todas elas "
+              "e podem passar de 100%.", file=stream)
 
-def organize_by_date():
+    def write_trace(self, file_path):
+        """Grava as fases no formato de trace do Chrome (abre em chrome://tracing ou no Perfetto)."""
+        events = [{'name': name, 'ph': 'X', 'pid': os.getpid(), 'tid': thread_id,
+                   'ts': round((start - self._started_at) * 1e6, 1), 'dur': round((end - start) * 1e6, 1)}
+                  for name, start, end, thread_id in self._trace or ()]
+        with open(file_path, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+
+_NULL_PHASE = contextlib.nullcontext()
+PROFILER = Profiler()
+
+@contextlib.contextmanager
+def profiling(stats_path=None, trace_path=None, stream=None):
     """
-    Organiza arquivos na pasta Downloads em subpastas baseadas em ano e mês de modificação.
+    Liga o PROFILER durante o bloco e, ao sair, imprime o relatório em 'stream' (stderr).
+    'stats_path' grava também a saída do cProfile (abre com pstats) e mostra as funções
+    mais caras; 'trace_path' grava o trace JSON das fases.
     """
-    source_folder = get_downloads_path()
-    date_output_base = os.path.join(source_folder, "Organizado_Por_Data")
+    stream = stream or sys.stderr
+    profile = cProfile.Profile() if stats_path else None
+    PROFILER.start(trace=bool(trace_path))
+    if profile is not None:
+        profile.enable()
+    try:
+        yield PROFILER
+    finally:
+        if profile is not None:
+            profile.disable()
+        PROFILER.stop()
+        PROFILER.report(stream)
+        if profile is not None:
+            profile.dump_stats(stats_path)
+            print(f"\nSaída do cProfile gravada em '{stats_path}' (só a thread principal). Funções mais caras:", file=stream)
+            pstats.Stats(profile, stream=stream).sort_stats('cumulative').print_stats(15)
+        if trace_path:
+            PROFILER.write_trace(trace_path)
+            print(f"Trace das fases gravado em '{trace_path}'.", file=stream)
 
-    if not os.path.exists(source_folder):
-        print(f"Erro: A pasta de Downloads não foi encontrada em '{source_folder}'.")
-        print("Certifique-se de ter executado 'termux-setup-storage' e concedido as permissões necessárias.")
-        input("Pressione Enter para continuar.")
-        return
+# --- Progresso ---
 
-    print(f"\n--- Analisando arquivos para organização por data em '{source_folder}' ---")
+def _format_duration(seconds):
+    """Formata segundos como MM:SS ou HH:MM:SS."""
+    seconds = int(seconds)
+    hours, remainder = divmod(seconds, 3600)
+    minutes, seconds = divmod(remainder, 60)
+    return f"{hours:d}:{minutes:02d}:{seconds:02d}" if hours else f"{minutes:02d}:{seconds:02d}"
 
-    # Obtém todos os arquivos no diretório de origem que não são pastas de destino do organizador
-    # E que não estão em uma das pastas de destino já existentes
-    files_to_organize = []
-    # Lista de pastas que não devem ser varridas para arquivos soltos, pois já são destinos do organizador
-    folders_to_exclude_from_root_scan = [
-        'Arquivos', 'Pastas_Organizadas', 'Organizado_Por_Data'
-    ]
-    
-    current_root_items = os.listdir(source_folder)
-    for item in current_root_items:
-        item_path = os.path.join(source_folder, item)
-        if os.path.isfile(item_path) and not item.startswith('.'):
-            files_to_organize.append(item)
-        elif os.path.isdir(item_path) and item in folders_to_exclude_from_root_scan:
-            # Se for uma pasta de destino, ignoramos seus arquivos internos para esta operação
-            pass
-        elif os.path.isdir(item_path) and not item.startswith('.'):
-            # Se for uma pasta que não é destino do organizador (ex: uma pasta de downloads original), não a movemos por data
-            # Apenas arquivos soltos são movidos por data nesta função
-            pass
+class ProgressReporter:
+    """
+    Linha de progresso com redesenho limitado a PROGRESS_SETTINGS['redraws_per_second']
+    vezes por segundo, mostrando vazão (arquivos/s e MB/s) e tempo restante estimado.
+    As linhas por arquivo passadas a log() vão para o arquivo de log configurado
+    (ou são descartadas); erros passados a error() sempre aparecem no terminal.
+    'total' pode ser None quando a quantidade não é conhecida de antemão.
+    add_bytes() pode ser chamado pelas threads de cópia, para a taxa em MB/s
+    acompanhar arquivos grandes enquanto eles ainda estão sendo copiados.
+    """
 
-    if not files_to_organize:
-        print("Nenhum arquivo solto na pasta Downloads para organizar por data.")
-        input("Pressione Enter para continuar.")
-        return
+    def __init__(self, total=None, unit="itens", stream=None):
+        self.total = total
+        self.unit = unit
+        self.done = 0
+        self.bytes_done = 0
+        self.stream = stream or sys.stdout
+        self._min_interval = 1.0 / max(PROGRESS_SETTINGS['redraws_per_second'], 0.1)
+        self._start_time = time.monotonic()
+        self._last_draw = 0.0
+        self._line_length = 0
+        self._lock = threading.Lock()
+        log_path = PROGRESS_SETTINGS['log_path']
+        self._log_file = open(log_path, 'a', encoding='utf-8') if log_path else None
 
-    print("\nArquivos detectados para organização por data:")
-    for file_name in files_to_organize:
-        print(f"- {file_name}")
-    
-    confirmacao = input("\nDigite 'confirmar' para iniciar a organização por data: ").strip().lower()
+    def log(self, message):
+        """Registra uma linha por arquivo no log, sem passar pelo terminal."""
+        if self._log_file is not None:
+            with PROFILER.phase('saída'):
+                self._log_file.write(message + "\n")
 
-    if confirmacao != 'confirmar':
-        print("Organização por data cancelada. Nada foi modificado.")
-        input("Pressione Enter para continuar.")
-        return
+    def error(self, message):
+        """Mostra um erro no terminal (acima da linha de progresso) e também no log."""
+        with self._lock, PROFILER.phase('saída'):
+            self._clear_line()
+            print(message, file=self.stream)
+            self.log(message)
+            self._draw()
 
-    print("\nIniciando organização por data...")
-    os.makedirs(date_output_base, exist_ok=True)
+    def advance(self, count=1, nbytes=0):
+        with self._lock:
+            self.done += count
+            self.bytes_done += nbytes
+            self._maybe_draw()
 
-    moved_count_by_year_month = {}
-    total_processed_files = 0
+    def add_bytes(self, nbytes):
+        with self._lock:
+            self.bytes_done += nbytes
+            self._maybe_draw()
 
-    for file_name in files_to_organize:
-        file_path = os.path.join(source_folder, file_name)
-        
-        try:
-            mod_timestamp = os.path.getmtime(file_path) # Data de modificação
-            dt_object = datetime.datetime.fromtimestamp(mod_timestamp)
-            
-            year_folder = str(dt_object.year)
-            month_folder = dt_object.strftime("%m - %B") # Ex: "06 - June"
-
-            dest_year_path = os.path.join(date_output_base, year_folder)
-            dest_month_path = os.path.join(dest_year_path, month_folder)
-
-            os.makedirs(dest_month_path, exist_ok=True)
-
-            final_dest_path = os.path.join(dest_month_path, file_name)
-
-            if os.path.exists(final_dest_path):
-                base_name = os.path.splitext(file_name)[0]
-                extension = os.path.splitext(file_name)[1]
-                suffix = 1
-                new_file_name = f"{base_name}_{suffix}{extension}"
-                while os.path.exists(os.path.join(dest_month_path, new_file_name)):
-                    suffix += 1
-                    new_file_name = f"{base_name}_{suffix}{extension}"
-                final_dest_path = os.path.join(dest_month_path, new_file_name)
-                print(f"\nConflito: '{file_name}' renomeado para '{new_file_name}'")
-
-            shutil.move(file_path, final_dest_path)
-            print(f"\nMovido: '{file_name}' para '{year_folder}/{month_folder}/'")
-            total_processed_files += 1
-            
-            year_month_key = f"{year_folder}/{month_folder}"
-            moved_count_by_year_month[year_month_key] = moved_count_by_year_month.get(year_month_key, 0) + 1
+    def finish(self):
+        """Desenha o estado final, quebra a linha e fecha o log."""
+        with self._lock:
+            self._draw()
+        self.stream.write("\n")
+        self.stream.flush()
+        if self._log_file is not None:
+            self._log_file.close()
+            self._log_file = None
 
-        except Exception as e:
-            print(f"\nErro ao organizar '{file_name}' por data: {e}")
+    def _maybe_draw(self):
+        now = time.monotonic()
+        if now - self._last_draw >= self._min_interval:
+            with PROFILER.phase('saída'):
+                self._draw(now)
 
-    print("\nOrganização por data concluída com sucesso!")
-    print(f"Total de {total_processed_files} arquivos processados na pasta Downloads.")
+    def _clear_line(self):
+        if self._line_length:
+            self.stream.write("\r" + " " * self._line_length + "\r")
 
-    print("\n--- Resumo da Organização por Data ---")
-    if moved_count_by_year_month:
-        for ym, count in sorted(moved_count_by_year_month.items()):
-            print(f"- {ym}: {count} arquivos")
-    else:
-        print("Nenhum arquivo foi movido por data.")
-    print("--------------------------------------")
-    input("Pressione Enter para continuar.")
+    def _draw(self, now=None):
+        now = now or time.monotonic()
+        self._last_draw = now
+        elapsed = max(now - self._start_time, 1e-6)
+        rate = self.done / elapsed
+        text = f"Progresso: {self.done} {self.unit}"
+        if self.total:
+            text = f"Progresso: {self.done / self.total * 100:.1f}% ({self.done}/{self.total} {self.unit})"
+        text += f" | {rate:.1f} arq/s | {convert_bytes(self.bytes_done / elapsed)}/s"
+        if self.total and rate > 0 and self.done < self.total:
+            text += f" | ETA {_format_duration((self.total - self.done) / rate)}"
+        padding = " " * max(self._line_length - len(text), 0)
+        self.stream.write("\r" + text + padding)
+        self.stream.flush()
+        self._line_length = len(text)
 
 
-def display_menu():
-    """Exibe o menu principal do organizador."""
-    print("\n" + "="*40)
-    print("      ORGANIZADOR DE DOWNLOADS CLI")
-    print("="*40)
-    print("1. Organizar arquivos (por categoria)")
-    print("2. Limpar arquivos (vazios/temporários)")
-    print("3. Remover pastas vazias") 
-    print("4. Organizar arquivos (por data)") 
-    print("5. Sair") 
-    print("="*40)
+# --- Plano de movimentação ---
 
-def main_menu():
-    """Loop principal do menu do aplicativo."""
-    while True:
-        display_menu()
-        choice = input("Digite sua escolha (1-5): ").strip() 
+# Uma ação do plano: origem, destino final (já com o nome livre de conflitos),
+# categoria e nome final. 'is_dir' marca as pastas movidas inteiras e 'size' é o
+# tamanho do arquivo (0 para pastas e planos antigos), usado na taxa em MB/s.
+MoveAction = namedtuple('MoveAction', ['source', 'destination', 'category', 'final_name', 'is_dir', 'size'],
+                        defaults=(0,))
 
-        if choice == '1':
-            organize_files_in_downloads()
-        elif choice == '2':
-            clean_files()
-        elif choice == '3': 
-            remove_empty_folders()
-        elif choice == '4': 
-            organize_by_date()
-        elif choice == '5': 
-            print("Saindo do organizador. Até mais!")
-            break
-        else:
-            print("Opção inválida. Por favor, escolha 1, 2, 3, 4 ou 5.") 
-            input("Pressione Enter para continuar.")
+# Categoria registrada nas ações que movem pastas inteiras
+FOLDER_CATEGORY = 'Pastas_Organizadas'
 
-if __name__ == "__main__":
-    main_menu()
+class NameRegistry:
+    """
+    Registro em memória dos nomes ocupados em cada pasta de destino.
+    Cada pasta é listada no máximo uma vez; a partir daí os conflitos são resolvidos
+    sem tocar no disco, e o próximo sufixo _N livre de cada nome é lembrado, de modo
+    que milhares de colisões do mesmo nome (IMG_0001.jpg...) não viram um laço quadrático.
+    Os nomes são comparados sem diferenciar maiúsculas (casefold), como no armazenamento
+    compartilhado do Android: 'IMG.JPG' e 'img.jpg' seriam o mesmo arquivo, e o segundo
+    os.rename substituiria o primeiro. O nome devolvido mantém a grafia original.
+    """
+
+    def __init__(self):
+        self._names_by_dir = {}
+        self._next_suffix = {}
 
+    def is_loaded(self, dest_dir):
+        """Indica se a pasta já foi listada (ou seja, se claim() não vai tocar no disco)."""
+        return dest_dir in self._names_by_dir
+
+    def _names_in(self, dest_dir):
+        names = self._names_by_dir.get(dest_dir)
+        if names is None:
+            try:
+                names = {name.casefold() for name in os.listdir(dest_dir)}
+            except OSError:
+                names = set() # A pasta ainda não existe: nada ocupado
+            self._names_by_dir[dest_dir] = names
+        return names
+
+    def claim(self, dest_dir, file_name):
+        """Reserva e retorna um nome livre em 'dest_dir' para 'file_name' (com sufixo _N se preciso)."""
+        names = self._names_in(dest_dir)
+        folded_name = file_name.casefold()
+        if folded_name not in names:
+            names.add(folded_name)
+            return file_name
+
+        PROFILER.count('nomes em conflito')
+        base_name, extension = CLASSIFIER.split_extension(file_name)
+        key = (dest_dir, base_name.casefold(), extension.casefold())
+        suffix = self._next_suffix.get(key, 1)
+        new_file_name = f"{base_name}_{suffix}{extension}"
+        while new_file_name.casefold() in names:
+            suffix += 1
+            new_file_name = f"{base_name}_{suffix}{extension}"
+        self._next_suffix[key] = suffix + 1
+        names.add(new_file_name.casefold())
+        return new_file_name
+
+def resolve_destination_name(registry, dest_dir, file_name):
+    """Função comum aos organizadores: devolve o nome final, livre de conflitos, de 'file_name' em 'dest_dir'."""
+    with PROFILER.phase('conflitos'):
+        return registry.claim(dest_dir, file_name)
+
+def category_destination(entry, source_folder, extension=None, classification=None):
+    """
+    Decide a pasta de destino e a categoria de um item da raiz de 'source_folder'.
+    'extension' é a extensão detectada pelo conteúdo, quando houver; 'classification'
+    é o (extensão, categoria) do nome já calculado em lote (FileClassifier.classify_many).
+    Retorna (pasta_destino, categoria) ou None se o item não deve ser movido.
+    """
+    if entry.is_dir:
+        if entry.name in ORGANIZER_OUTPUT_FOLDERS:
+            return None
+        return os.path.join(source_folder, "Pastas_Organizadas"), FOLDER_CATEGORY
+    if entry.is_file:
+        category_name = RULES.match(entry)
+        if extension is None and classification is not None:
+            extension = classification[0]
+            if category_name is None:
+                category_name = classification[1]
+        _, dest_dir, category_name = get_file_destination_paths(entry.name, os.path.join(source_folder, "Arquivos"),
+                                                                extension, category_name)
+        return dest_dir, category_name
+    return None
+
+def build_category_move_plan(source_folder, entries=None, sniff=False, workers=DEFAULT_MOVE_WORKERS):
+    """
+    Planeja a organização por categoria de 'source_folder' uma única vez: destino,
+    categoria e nome final (com conflitos já resolvidos) de cada item.
+    Com 'entries' (ScanEntry já lidos da raiz), planeja só esses itens em vez de listar a pasta.
+    Com 'sniff', os arquivos de extensão desconhecida são classificados pelo conteúdo
+    (cabeçalhos lidos por 'workers' threads).
+    Retorna uma tupla imutável de MoveAction, com as pastas antes dos arquivos.
+    """
+    # Uma única passada no diretório classifica arquivos e pastas
+    if entries is None:
+        with PROFILER.phase('listagem'):
+            entries = list(scan_directory(source_folder))
+    root_entries = entries
+    with PROFILER.phase('conteúdo'):
+        sniffed = SNIFFER.sniff_many(root_entries, workers) if sniff else {}
+    classifications = CLASSIFIER.classify_many([entry.name for entry in root_entries])
+    registry = NameRegistry()
+    folder_actions = []
+    file_actions = []
+
+    for entry, classification in zip(root_entries, classifications):
+        destination = category_destination(entry, source_folder, sniffed.get(entry.path), classification)
+        if destination is None:
+            continue
+        dest_dir, category_name = destination
+        final_name = resolve_destination_name(registry, dest_dir, entry.name)
+        actions = folder_actions if entry.is_dir else file_actions
+        actions.append(MoveAction(entry.path, os.path.join(dest_dir, final_name), category_name,
+                                  final_name, entry.is_dir, entry.size if entry.is_file else 0))
+
+    return tuple(folder_actions + file_actions)
+
+def export_move_plan(plan, file_path):
+    """
+    Grava o plano em JSON (um objeto com a lista de ações) ou, se o arquivo
+    terminar em '.ndjson', em NDJSON (uma ação por linha).
+    """
+    with open(file_path, 'w', encoding='utf-8') as plan_file:
+        if file_path.endswith('.ndjson'):
+            for action in plan:
+                plan_file.write(json.dumps(action._asdict(), ensure_ascii=False) + "\n")
+        else:
+            json.dump({'version': 1, 'actions': [action._asdict() for action in plan]},
+                      plan_file, ensure_ascii=False)
+
+def load_move_plan(file_path):
+    """Lê um plano gravado por export_move_plan (JSON ou NDJSON) e o retorna como tupla de MoveAction."""
+    with open(file_path, encoding='utf-8') as plan_file:
+        if file_path.endswith('.ndjson'):
+            records = [json.loads(line) for line in plan_file if line.strip()]
+        else:
+            records = json.load(plan_file)['actions']
+    return tuple(MoveAction(**record) for record in records)
+
+
+# --- Motor de movimentação em paralelo ---
+
+class DirectoryEnsurer:
+    """
+    Garante que as pastas de destino existam, criando cada uma no máximo uma vez.
+    Lembra as pastas já conferidas ou criadas (e todas as pastas acima delas), de
+    modo que os milhares de arquivos de uma mesma pasta não repetem o os.makedirs.
+    """
+
+    def __init__(self):
+        self._known_dirs = set()
+
+    def is_known(self, dir_path):
+        return dir_path in self._known_dirs
+
+    def ensure(self, dir_path):
+        if dir_path in self._known_dirs:
+            return
+        with PROFILER.phase('criar pastas'):
+            os.makedirs(dir_path, exist_ok=True)
+        while dir_path not in self._known_dirs:
+            self._known_dirs.add(dir_path)
+            parent = os.path.dirname(dir_path)
+            if parent == dir_path:
+                break
+            dir_path = parent
+
+    def precompute(self, plan):
+        """Cria de uma vez todas as pastas de destino do plano. Erros ficam para a movimentação reportar."""
+        for dir_path in sorted({os.path.dirname(action.destination) for action in plan}):
+            try:
+                self.ensure(dir_path)
+            except OSError:
+                pass
+
+# Resultado de cada ação executada: destino real (None em caso de erro) e a exceção, se houver
+MoveResult = namedtuple('MoveResult', ['action', 'destination', 'error'])
+
+class MoveBackend:
+    """
+    Move arquivos escolhendo o caminho mais rápido para cada destino:
+    - mesmo dispositivo (st_dev igual): os.rename, que só troca a entrada de diretório;
+    - dispositivos diferentes: cópia em blocos grandes com os.copy_file_range
+      (ou os.sendfile, ou leitura/escrita comum), informando cada bloco copiado.
+    Os originais copiados só são apagados depois de um fsync dos destinos, feito em
+    lotes de FSYNC_BATCH_SIZE arquivos; se o processo morrer antes, sobram cópias,
+    nunca perdas. 'on_source_removed(origem)' é chamado (por qualquer thread) depois
+    de cada original apagado; os que não puderam ser concluídos ficam guardados até
+    take_failed_removals(). Chame flush() ao final para concluir o último lote.
+    """
+
+    def __init__(self, fsync_batch_size=FSYNC_BATCH_SIZE, on_source_removed=None):
+        self._fsync_batch_size = fsync_batch_size
+        self._on_source_removed = on_source_removed
+        self._dir_devices = {}
+        self._pending_removals = []
+        self._failed_removals = []
+        self._lock = threading.Lock()
+
+    def _device_of_dir(self, dir_path):
+        device = self._dir_devices.get(dir_path)
+        if device is None:
+            device = os.stat(dir_path).st_dev
+            self._dir_devices[dir_path] = device
+        return device
+
+    def move(self, source, destination, on_bytes=None):
+        """Move 'source' para 'destination' (que não deve existir). 'on_bytes(n)' recebe o progresso em bytes."""
+        with PROFILER.phase('mover'):
+            self._move(source, destination, on_bytes or (lambda nbytes: None))
+
+    def _move(self, source, destination, on_bytes):
+        source_stat = os.lstat(source)
+
+        if source_stat.st_dev == self._device_of_dir(os.path.dirname(destination)):
+            try:
+                os.rename(source, destination)
+                on_bytes(source_stat.st_size)
+                return
+            except OSError as e:
+                if e.errno != errno.EXDEV: # Montagens diferentes do mesmo dispositivo (comum no Android)
+                    raise
+
+        PROFILER.count('movidos entre dispositivos')
+        if not stat.S_ISREG(source_stat.st_mode):
+            # Pastas e links simbólicos entre dispositivos ficam com o shutil
+            shutil.move(source, destination)
+            on_bytes(source_stat.st_size)
+            return
+
+        copied = _copy_file_streaming(source, destination, on_bytes)
+        if copied != source_stat.st_size:
+            # O original mudou durante a cópia (ou a cópia ficou incompleta): ele não pode ser apagado
+            os.remove(destination)
+            raise OSError(errno.EIO, f"cópia incompleta ({copied} de {source_stat.st_size} bytes)", source)
+        shutil.copystat(source, destination)
+        self._schedule_source_removal(source, destination)
+
+    def _schedule_source_removal(self, source, destination):
+        with self._lock:
+            self._pending_removals.append((source, destination))
+            if len(self._pending_removals) < self._fsync_batch_size:
+                return
+            batch, self._pending_removals = self._pending_removals, []
+        self.sync_and_remove(batch)
+
+    def flush(self):
+        """Conclui o lote pendente: fsync dos destinos e remoção dos originais."""
+        with self._lock:
+            batch, self._pending_removals = self._pending_removals, []
+        self.sync_and_remove(batch)
+
+    def take_failed_removals(self):
+        """Retorna (e esquece) os (origem, erro) das cópias que não puderam ser concluídas até agora."""
+        with self._lock:
+            failures, self._failed_removals = self._failed_removals, []
+        return failures
+
+    def sync_and_remove(self, batch):
+        """
+        Faz o fsync de cada destino (e da sua pasta) da lista de (origem, destino) e só então
+        apaga a origem. Se algo falhar, o original é mantido e o erro vai para take_failed_removals().
+        """
+        synced_dirs = set()
+        for source, destination in batch:
+            try:
+                fd = os.open(destination, os.O_RDONLY)
+                try:
+                    os.fsync(fd)
+                finally:
+                    os.close(fd)
+                dest_dir = os.path.dirname(destination)
+                if dest_dir not in synced_dirs:
+                    synced_dirs.add(dest_dir)
+                    dir_fd = os.open(dest_dir, os.O_RDONLY)
+                    try:
+                        os.fsync(dir_fd)
+                    finally:
+                        os.close(dir_fd)
+                os.remove(source)
+                if self._on_source_removed is not None:
+                    self._on_source_removed(source)
+            except OSError as e:
+                with self._lock:
+                    self._failed_removals.append((source, e))
+
+def removal_error_message(source, error):
+    """Mensagem de uma cópia entre dispositivos que não pôde ser concluída (MoveBackend.take_failed_removals)."""
+    return f"Erro ao concluir a cópia de '{os.path.basename(source)}' (o original foi mantido): {error}"
+
+def _copy_file_streaming(source, destination, on_bytes):
+    """
+    Copia o conteúdo de 'source' para 'destination' (criado agora; falha se já existir)
+    em blocos de COPY_CHUNK_SIZE, usando a chamada mais eficiente disponível.
+    Em caso de erro, a cópia parcial é apagada. Retorna quantos bytes foram copiados.
+    """
+    methods = [m for m in ('copy_file_range', 'sendfile') if hasattr(os, m)] + ['read']
+    with open(source, 'rb', buffering=0) as src, open(destination, 'xb', buffering=0) as dst:
+        try:
+            in_fd, out_fd = src.fileno(), dst.fileno()
+            buffer = None
+            total = 0
+            while True:
+                method = methods[0]
+                try:
+                    if method == 'copy_file_range':
+                        copied = os.copy_file_range(in_fd, out_fd, COPY_CHUNK_SIZE)
+                    elif method == 'sendfile':
+                        copied = os.sendfile(out_fd, in_fd, None, COPY_CHUNK_SIZE)
+                    else:
+                        if buffer is None:
+                            buffer = bytearray(COPY_CHUNK_SIZE)
+                        copied = src.readinto(buffer)
+                        pending = memoryview(buffer)[:copied]
+                        while pending: # O FileIO sem buffer pode escrever menos que o pedido
+                            pending = pending[dst.write(pending):]
+                except OSError as e:
+                    if method != 'read' and e.errno in (errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP):
+                        methods.pop(0) # Chamada não suportada entre estes sistemas de arquivos: tenta a próxima
+                        continue
+                    raise
+                if not copied:
+                    break
+                total += copied
+                on_bytes(copied)
+        except BaseException:
+            dst.close()
+            os.remove(destination)
+            raise
+    return total
+
+class _DestinationLocks:
+    """
+    Trava por pasta de destino. Enquanto a trava está com uma thread, ela confere se
+    o nome planejado continua livre (o disco pode ter mudado desde o planejamento)
+    e o reserva, para que duas threads nunca usem o mesmo nome. A conferência usa um
+    NameRegistry novo, que relista cada pasta uma única vez na execução.
+    """
+
+    def __init__(self, ensurer):
+        self._guard = threading.Lock()
+        self._locks = {}
+        self._registry = NameRegistry()
+        self._ensurer = ensurer
+
+    def acquire_free_name(self, dest_dir, file_name):
+        with self._guard:
+            lock = self._locks.setdefault(dest_dir, threading.Lock())
+        with lock:
+            self._ensurer.ensure(dest_dir)
+            return resolve_destination_name(self._registry, dest_dir, file_name)
+
+def _execute_action(locks, backend, action, on_bytes):
+    """Executa uma ação do plano. Roda dentro do pool."""
+    dest_dir = os.path.dirname(action.destination)
+    try:
+        final_name = locks.acquire_free_name(dest_dir, action.final_name)
+        destination = os.path.join(dest_dir, final_name)
+        backend.move(action.source, destination, on_bytes)
+        return MoveResult(action, destination, None)
+    except Exception as e:
+        return MoveResult(action, None, e)
+
+# --- Diário das movimentações (retomada e desfazer) ---
+
+def get_journal_dir():
+    """Pasta dos diários de movimentação (criada se preciso)."""
+    journal_dir = os.path.join(get_app_data_path(), 'diarios')
+    os.makedirs(journal_dir, exist_ok=True)
+    return journal_dir
+
+def find_latest_journal():
+    """Caminho do diário mais recente, ou None se não houver nenhum."""
+    journal_dir = get_journal_dir()
+    names = sorted(name for name in os.listdir(journal_dir) if name.endswith('.ndjson'))
+    return os.path.join(journal_dir, names[-1]) if names else None
+
+class MoveJournal:
+    """
+    Diário só de acréscimo (NDJSON) das movimentações de uma execução, em get_journal_dir().
+    Cada linha é uma lista compacta; os caminhos são internados por pasta:
+      ["R", versão, operação, raiz, início]      cabeçalho
+      ["D", id, caminho]                         pasta, citada pelo id nas linhas seguintes
+      ["P", i, id_origem, nome, id_destino, nome_final, categoria, é_pasta, tamanho]
+      ["M", i] ou ["M", i, nome_real]            ação concluída (nome real, se mudou)
+      ["X", i]                                   original apagado depois da cópia entre dispositivos
+      ["E", i, erro]  ["U", i]  ["F"]            erro, ação desfeita, execução terminada
+    O plano é gravado e sincronizado antes da primeira movimentação; os resultados
+    passam por fsync em lotes de JOURNAL_SYNC_BATCH. O que ficou sem registro numa
+    interrupção é deduzido do estado do disco na retomada. Os "X" chegam das threads
+    do MoveBackend, então a escrita é protegida por uma trava.
+    """
+
+    VERSION = 1
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self.operation = None
+        self.root = None
+        self.actions = {}     # índice -> MoveAction
+        self.status = {}      # índice -> 'done', 'failed' ou 'undone'
+        self.final_names = {} # índice -> nome real, quando difere do planejado
+        self.done_order = []  # índices concluídos, na ordem do diário
+        self.removed_sources = set() # índices com registro "X"
+        self.finished = False
+        self._index_of = {}
+        self._index_of_source = {}
+        self._dir_ids = {}
+        self._unsynced = 0
+        self._file = None
+        self._lock = threading.RLock()
+
+    @classmethod
+    def create(cls, operation, root):
+        """Começa o diário de uma nova execução e apaga os diários mais antigos que JOURNAL_KEEP."""
+        journal_dir = get_journal_dir()
+        stamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S_%f')
+        journal = cls(os.path.join(journal_dir, f"{stamp}_{operation}.ndjson"))
+        journal.operation, journal.root = operation, root
+        journal._write(['R', cls.VERSION, operation, root, time.time()])
+        for old_name in sorted(name for name in os.listdir(journal_dir) if name.endswith('.ndjson'))[:-JOURNAL_KEEP]:
+            with contextlib.suppress(OSError):
+                os.remove(os.path.join(journal_dir, old_name))
+        return journal
+
+    @classmethod
+    def load(cls, file_path):
+        """Lê um diário existente (para retomar ou desfazer); novos registros são acrescentados a ele."""
+        journal = cls(file_path)
+        dirs = {}
+        with open(file_path, encoding='utf-8') as journal_file:
+            for line in journal_file:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue # Linha cortada pela interrupção
+                kind = record[0]
+                if kind == 'D':
+                    dirs[record[1]] = record[2]
+                elif kind == 'P':
+                    _, index, source_dir, source_name, dest_dir, final_name, category, is_dir, size = record
+                    journal._register(index, MoveAction(os.path.join(dirs[source_dir], source_name),
+                                                        os.path.join(dirs[dest_dir], final_name),
+                                                        category, final_name, bool(is_dir), size))
+                elif kind == 'M':
+                    journal.status[record[1]] = 'done'
+                    journal.done_order.append(record[1])
+                    if len(record) > 2:
+                        journal.final_names[record[1]] = record[2]
+                elif kind == 'X':
+                    journal.removed_sources.add(record[1])
+                elif kind == 'E':
+                    journal.status[record[1]] = 'failed'
+                elif kind == 'U':
+                    journal.status[record[1]] = 'undone'
+                elif kind == 'F':
+                    journal.finished = True
+                elif kind == 'R':
+                    journal.operation, journal.root = record[2], record[3]
+        journal._dir_ids = {path: dir_id for dir_id, path in dirs.items()}
+        return journal
+
+    @staticmethod
+    def is_finished_file(file_path):
+        """Confere só o fim do arquivo para saber se a execução do diário terminou."""
+        with open(file_path, 'rb') as journal_file:
+            journal_file.seek(0, os.SEEK_END)
+            journal_file.seek(max(journal_file.tell() - 8, 0))
+            return journal_file.read().endswith(b'["F"]\n')
+
+    def _register(self, index, action):
+        self.actions[index] = action
+        self._index_of[action] = index
+        self._index_of_source[action.source] = index
+
+    def _write(self, record):
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.file_path, 'a', encoding='utf-8')
+            self._file.write(json.dumps(record, ensure_ascii=False, separators=(',', ':')) + "\n")
+
+    def _dir_id(self, dir_path):
+        dir_id = self._dir_ids.get(dir_path)
+        if dir_id is None:
+            dir_id = len(self._dir_ids)
+            self._dir_ids[dir_path] = dir_id
+            self._write(['D', dir_id, dir_path])
+        return dir_id
+
+    def _record_result(self, record):
+        with self._lock:
+            self._write(record)
+            self._unsynced += 1
+            if self._unsynced >= JOURNAL_SYNC_BATCH:
+                self.sync()
+
+    def destination_of(self, index):
+        """Caminho real de uma ação concluída."""
+        action = self.actions[index]
+        return os.path.join(os.path.dirname(action.destination), self.final_names.get(index, action.final_name))
+
+    def plan(self, actions, sync=True):
+        """
+        Registra as ações ainda não registradas. Com sync=True espera o fsync; sem ele,
+        as linhas só chegam ao sistema operacional (o que já sobrevive à morte do processo).
+        """
+        for action in actions:
+            if action in self._index_of:
+                continue
+            index = len(self._index_of)
+            self._register(index, action)
+            self._write(['P', index, self._dir_id(os.path.dirname(action.source)), os.path.basename(action.source),
+                         self._dir_id(os.path.dirname(action.destination)), action.final_name,
+                         action.category, int(action.is_dir), action.size])
+        if sync:
+            self.sync()
+        elif self._file is not None:
+            self._file.flush()
+
+    def completed(self, action, destination):
+        index = self._index_of[action]
+        record = ['M', index]
+        if os.path.basename(destination) != action.final_name:
+            record.append(os.path.basename(destination))
+            self.final_names[index] = record[2]
+        self.status[index] = 'done'
+        self.done_order.append(index)
+        self._record_result(record)
+
+    def failed(self, action, error):
+        index = self._index_of[action]
+        self.status[index] = 'failed'
+        self._record_result(['E', index, str(error)])
+
+    def undone(self, index):
+        self.status[index] = 'undone'
+        self._record_result(['U', index])
+
+    def source_removed(self, source):
+        """Registra que o original de uma cópia entre dispositivos foi apagado (MoveBackend.on_source_removed)."""
+        index = self._index_of_source.get(source)
+        if index is None:
+            return
+        with self._lock:
+            self.removed_sources.add(index)
+            self._record_result(['X', index])
+
+    def sync(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+                os.fsync(self._file.fileno())
+            self._unsynced = 0
+
+    def finish(self):
+        """Marca a execução como terminada e fecha o diário."""
+        self._write(['F'])
+        self.finished = True
+        self.close()
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self.sync()
+                self._file.close()
+                self._file = None
+
+def _next_result(futures):
+    """Espera e retira o primeiro futuro de 'futures'; só sai da fila depois de concluído."""
+    result = futures[0].result()
+    futures.popleft()
+    return result
+
+def execute_move_plan(plan, workers=DEFAULT_MOVE_WORKERS, ensurer=None, on_bytes=None, journal=None,
+                      on_removal_error=None):
+    """
+    Executa as ações do plano em um ThreadPoolExecutor com 'workers' threads.
+    Gera os MoveResult na mesma ordem do plano, de modo que a saída e os totais
+    não dependam da ordem de término. As pastas de destino são criadas antes,
+    em lote, pelo DirectoryEnsurer ('ensurer' permite compartilhá-lo entre execuções).
+    'on_bytes(n)' é chamado (pelas threads) conforme os bytes são movidos.
+    Com 'journal' (MoveJournal), o plano é gravado antes da primeira movimentação,
+    cada resultado em seguida, e o diário é encerrado quando o plano termina.
+    As ações entram no pool aos poucos (MOVE_SUBMIT_AHEAD por thread): se a execução
+    é interrompida, as que ainda não começaram são canceladas, as em andamento
+    terminam e também vão para o diário.
+    'on_removal_error(origem, erro)' recebe, na thread de quem consome os resultados,
+    as cópias entre dispositivos cujo original não pôde ser apagado (a ação já tinha
+    saído como concluída); sem ele, o erro é só mostrado.
+    """
+    if ensurer is None:
+        ensurer = DirectoryEnsurer()
+    if journal is not None:
+        with PROFILER.phase('diário'):
+            journal.plan(plan)
+    ensurer.precompute(plan)
+    locks = _DestinationLocks(ensurer)
+    backend = MoveBackend(on_source_removed=journal.source_removed if journal is not None else None)
+    workers = max(1, workers)
+    window = workers * (1 + MOVE_SUBMIT_AHEAD)
+    completed = False
+
+    def report_failed_removals():
+        for source, error in backend.take_failed_removals():
+            if on_removal_error is not None:
+                on_removal_error(source, error)
+            else:
+                print("\n" + removal_error_message(source, error))
+
+    def record(result):
+        report_failed_removals()
+        if journal is not None:
+            with PROFILER.phase('diário'):
+                if result.error is None:
+                    journal.completed(result.action, result.destination)
+                else:
+                    journal.failed(result.action, result.error)
+        return result
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = deque()
+            try:
+                for action in plan:
+                    futures.append(executor.submit(_execute_action, locks, backend, action, on_bytes))
+                    if len(futures) >= window:
+                        yield record(_next_result(futures))
+                while futures:
+                    yield record(_next_result(futures))
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+                executor.shutdown(wait=True)
+                for future in futures:
+                    if not future.cancelled():
+                        record(future.result())
+                raise
+        completed = True
+    finally:
+        backend.flush()
+        report_failed_removals()
+        if journal is not None:
+            if completed:
+                journal.finish()
+            else:
+                journal.close()
+
+def pause(interactive):
+    """Espera o Enter do usuário antes de voltar ao menu (apenas no modo interativo)."""
+    if interactive:
+        input("Pressione Enter para continuar.")
+
+def confirm(prompt, expected_answer, assume_yes):
+    """Pede que o usuário digite 'expected_answer' para confirmar; com assume_yes confirma direto."""
+    if assume_yes:
+        return True
+    return input(prompt).strip().lower() == expected_answer
+
+def run_category_move_plan(plan, workers=DEFAULT_MOVE_WORKERS, journal=None, on_result=None):
+    """
+    Executa um plano de organização por categoria mostrando o andamento e o resumo.
+    Retorna o resumo: itens processados, arquivos movidos por categoria
+    (o dicionário moved_files_count), pastas movidas e erros.
+    'journal' registra as movimentações para 'resume' e 'undo'; 'on_result' recebe cada MoveResult.
+    """
+    total_items = len(plan)
+    processed_items = 0
+    moved_files_count = {} 
+    moved_folders_count = 0 
+    error_count = 0
+    progress = ProgressReporter(total_items)
+
+    def removal_failed(source, error):
+        nonlocal error_count
+        progress.error(removal_error_message(source, error))
+        error_count += 1
+
+    for result in execute_move_plan(plan, workers, on_bytes=progress.add_bytes, journal=journal,
+                                    on_removal_error=removal_failed):
+        action = result.action
+        item_name = os.path.basename(action.source)
+        processed_items += 1
+        if on_result is not None:
+            on_result(result)
+
+        if result.error is not None:
+            kind = "pasta" if action.is_dir else "arquivo"
+            progress.error(f"Erro ao mover {kind} '{item_name}': {result.error}")
+            error_count += 1
+        elif action.is_dir:
+            progress.log(f"Movido pasta: '{item_name}' para '{os.path.basename(os.path.dirname(result.destination))}/'")
+            moved_folders_count += 1
+        else:
+            if os.path.basename(result.destination) != item_name:
+                progress.log(f"Conflito: '{item_name}' renomeado para '{os.path.basename(result.destination)}'")
+            final_extension_folder_path = os.path.dirname(result.destination)
+            category_base_path = os.path.dirname(final_extension_folder_path)
+            progress.log(f"Movido arquivo: '{item_name}' para '{os.path.basename(category_base_path)}/{os.path.basename(final_extension_folder_path)}/'")
+            moved_files_count[action.category] = moved_files_count.get(action.category, 0) + 1
+        
+        progress.advance()
+
+    progress.finish()
+    summary = {
+        'processed': processed_items,
+        'moved_files': moved_files_count,
+        'moved_folders': moved_folders_count,
+        'errors': error_count,
+    }
+    print_category_summary(summary)
+    return summary
+
+def print_category_summary(summary):
+    """Mostra o resumo de uma organização por categoria (sync ou assíncrona)."""
+    if summary['errors']:
+        print(f"\nOrganização por categoria concluída com {summary['errors']} erros (veja as mensagens acima).")
+    else:
+        print("\nOrganização por categoria concluída com sucesso!")
+    print(f"Total de {summary['processed']} itens processados na pasta Downloads.")
+
+    print("\n--- Resumo da Organização por Categoria ---")
+    if summary['moved_folders'] > 0:
+        print(f"Pastas movidas para 'Pastas_Organizadas/': {summary['moved_folders']}")
+    
+    if summary['moved_files']:
+        print("Arquivos movidos por categoria:")
+        for category, count in sorted(summary['moved_files'].items()):
+            print(f"- {category}: {count} arquivos")
+    else:
+        print("Nenhum arquivo foi movido por categoria.")
+    print("------------------------------------------")
+
+
+def organize_files_in_downloads(workers=DEFAULT_MOVE_WORKERS, root=None, assume_yes=False,
+                                dry_run=False, interactive=True, plan=None, sniff=False):
+    """
+    Organiza arquivos e subpastas dentro da pasta Downloads do celular
+    com base na nova estrutura de categorias.
+    O plano é calculado uma vez (ou recebido pronto em 'plan'), mostrado para
+    confirmação e então executado em paralelo por 'workers' threads.
+    'root' troca a pasta de origem, 'assume_yes' dispensa a confirmação,
+    'dry_run' só mostra o plano e 'interactive' controla as pausas do menu.
+    Com 'sniff', arquivos sem extensão conhecida são classificados pelo conteúdo.
+    Retorna um dicionário com o resumo da operação.
+    """
+    
+    source_folder = root or get_downloads_path()
+    summary = {'operation': 'organize', 'root': source_folder, 'dry_run': dry_run}
+
+    if not os.path.exists(source_folder):
+        print(f"Erro: A pasta de Downloads não foi encontrada em '{source_folder}'.")
+        print("Certifique-se de ter executado 'termux-setup-storage' e concedido as permissões necessárias.")
+        pause(interactive)
+        return dict(summary, status='error')
+
+    print(f"\n--- Analisando arquivos em '{source_folder}' ---")
+
+    if plan is None:
+        with PROFILER.phase('plano'):
+            plan = build_category_move_plan(source_folder, sniff=sniff, workers=workers)
+
+    if not plan:
+        print("Nenhum arquivo ou pasta para organizar encontrado na pasta Downloads.")
+        pause(interactive)
+        return dict(summary, status='nothing_to_do')
+
+    file_actions = [action for action in plan if not action.is_dir]
+    folder_actions = [action for action in plan if action.is_dir]
+
+    with PROFILER.phase('prévia'):
+        print("\nArquivos detectados para organização por categoria:")
+        for action in file_actions:
+            final_path = os.path.dirname(action.destination)
+            print(f"- {os.path.basename(action.source)} -> Categoria: {action.category} -> {os.path.basename(os.path.dirname(final_path))}/{os.path.basename(final_path)}/")
+
+        if folder_actions:
+            print("\nPasta(s) detectada(s) para organização por categoria:")
+            for action in folder_actions:
+                print(f"- {os.path.basename(action.source)}/ -> Pastas_Organizadas/")
+
+    if dry_run:
+        planned_files = {}
+        for action in file_actions:
+            planned_files[action.category] = planned_files.get(action.category, 0) + 1
+        print("\nSimulação: nada foi modificado.")
+        pause(interactive)
+        return dict(summary, status='ok', planned_files=planned_files, planned_folders=len(folder_actions))
+
+    if not confirm("\nDigite 'confirmar' para iniciar a organização por categoria: ", 'confirmar', assume_yes):
+        print("Organização por categoria cancelada. Nada foi modificado.")
+        pause(interactive)
+        return dict(summary, status='cancelled')
+
+    print("\nIniciando organização por categoria...")
+    journal = MoveJournal.create('organize', source_folder)
+    with PROFILER.phase('execução'):
+        summary.update(run_category_move_plan(plan, workers, journal), status='ok')
+
+    pause(interactive)
+    return summary
+
+
+# --- Organização por categoria assíncrona ---
+
+def _next_chunk(iterator, size):
+    """Lê até 'size' itens de um iterador (chamado em thread pelo pipeline assíncrono)."""
+    chunk = []
+    for item in iterator:
+        chunk.append(item)
+        if len(chunk) >= size:
+            break
+    return chunk
+
+async def _organize_pipeline(source_folder, workers, progress, sniff=False, journal=None):
+    """
+    Organização por categoria em três etapas ligadas por filas limitadas:
+    varredura -> planejamento (classificação, conflitos, pastas) -> movimentação.
+    Enquanto uma etapa espera o disco, as outras continuam; toda chamada bloqueante
+    passa por asyncio.to_thread sob um semáforo de 'workers' vagas.
+    Com 'sniff', o planejamento lê o cabeçalho dos arquivos de extensão desconhecida.
+    Com 'journal', cada ação é registrada no diário antes de entrar na fila de movimentação.
+    Retorna o mesmo resumo de run_category_move_plan.
+    """
+    semaphore = asyncio.Semaphore(max(1, workers))
+    scan_queue = asyncio.Queue(maxsize=ASYNC_QUEUE_SIZE)
+    move_queue = asyncio.Queue(maxsize=ASYNC_QUEUE_SIZE)
+    backend = MoveBackend(on_source_removed=journal.source_removed if journal is not None else None)
+    mover_count = max(1, workers)
+    summary = {'processed': 0, 'moved_files': {}, 'moved_folders': 0, 'errors': 0}
+
+    async def blocking(func, *args):
+        async with semaphore:
+            return await asyncio.to_thread(func, *args)
+
+    async def scan_stage():
+        iterator = scan_directory(source_folder)
+        while True:
+            chunk = await blocking(_next_chunk, iterator, ASYNC_SCAN_CHUNK)
+            if not chunk:
+                break
+            for entry in chunk:
+                await scan_queue.put(entry)
+        await scan_queue.put(None)
+
+    async def plan_stage():
+        # Só esta etapa usa o registro de nomes e o DirectoryEnsurer, então não há disputa entre threads
+        registry = NameRegistry()
+        ensurer = DirectoryEnsurer()
+        while (entry := await scan_queue.get()) is not None:
+            extension = None
+            if sniff and SNIFFER.needs_sniffing(entry):
+                extension = await blocking(SNIFFER.sniff, entry)
+            destination = category_destination(entry, source_folder, extension)
+            if destination is None:
+                continue
+            dest_dir, category_name = destination
+            if registry.is_loaded(dest_dir):
+                final_name = resolve_destination_name(registry, dest_dir, entry.name)
+            else:
+                final_name = await blocking(resolve_destination_name, registry, dest_dir, entry.name)
+            if not ensurer.is_known(dest_dir):
+                try:
+                    await blocking(ensurer.ensure, dest_dir)
+                except OSError:
+                    pass # O erro aparece na movimentação
+            action = MoveAction(entry.path, os.path.join(dest_dir, final_name), category_name,
+                                final_name, entry.is_dir, entry.size if entry.is_file else 0)
+            if journal is not None:
+                journal.plan([action], sync=False)
+            await move_queue.put(action)
+        for _ in range(mover_count):
+            await move_queue.put(None)
+
+    def report_failed_removals():
+        for source, error in backend.take_failed_removals():
+            progress.error(removal_error_message(source, error))
+            summary['errors'] += 1
+
+    async def move_stage():
+        while (action := await move_queue.get()) is not None:
+            item_name = os.path.basename(action.source)
+            try:
+                await blocking(backend.move, action.source, action.destination, progress.add_bytes)
+            except Exception as e:
+                kind = "pasta" if action.is_dir else "arquivo"
+                progress.error(f"Erro ao mover {kind} '{item_name}': {e}")
+                summary['errors'] += 1
+                if journal is not None:
+                    journal.failed(action, e)
+            else:
+                if journal is not None:
+                    journal.completed(action, action.destination)
+                if action.is_dir:
+                    summary['moved_folders'] += 1
+                else:
+                    summary['moved_files'][action.category] = summary['moved_files'].get(action.category, 0) + 1
+                progress.log(f"Movido: '{item_name}' para '{os.path.relpath(os.path.dirname(action.destination), source_folder)}/'")
+            summary['processed'] += 1
+            report_failed_removals()
+            progress.advance()
+
+    completed = False
+    try:
+        await asyncio.gather(scan_stage(), plan_stage(), *(move_stage() for _ in range(mover_count)))
+        completed = True
+    finally:
+        await asyncio.to_thread(backend.flush)
+        report_failed_removals()
+        if journal is not None:
+            if completed:
+                journal.finish()
+            else:
+                journal.close()
+
+    # A ordem de término varia entre execuções; o resumo sai sempre na mesma ordem
+    summary['moved_files'] = dict(sorted(summary['moved_files'].items()))
+    return summary
+
+def organize_files_async(workers=DEFAULT_MOVE_WORKERS, root=None, assume_yes=False, interactive=True, sniff=False):
+    """
+    Variante assíncrona da organização por categoria: varredura, planejamento e
+    movimentação acontecem ao mesmo tempo, sem prévia item a item.
+    Retorna um dicionário com o resumo da operação, no mesmo formato de organize_files_in_downloads.
+    """
+    source_folder = root or get_downloads_path()
+    summary = {'operation': 'organize', 'root': source_folder, 'dry_run': False}
+
+    if not os.path.exists(source_folder):
+        print(f"Erro: A pasta de Downloads não foi encontrada em '{source_folder}'.")
+        print("Certifique-se de ter executado 'termux-setup-storage' e concedido as permissões necessárias.")
+        pause(interactive)
+        return dict(summary, status='error')
+
+    print(f"\n--- Organização por categoria (pipeline assíncrono) em '{source_folder}' ---")
+    if not confirm("\nOs itens serão movidos sem prévia. Digite 'confirmar' para iniciar: ", 'confirmar', assume_yes):
+        print("Organização por categoria cancelada. Nada foi modificado.")
+        pause(interactive)
+        return dict(summary, status='cancelled')
+
+    progress = ProgressReporter()
+    try:
+        journal = MoveJournal.create('organize', source_folder)
+        result = asyncio.run(_organize_pipeline(source_folder, workers, progress, sniff, journal))
+    finally:
+        progress.finish()
+    print_category_summary(result)
+    pause(interactive)
+    return dict(summary, status='ok', **result)
+
+
+# --- Modo de observação: organiza os downloads conforme eles chegam ---
+
+class InotifyWatcher:
+    """
+    Observa a raiz de uma pasta com inotify (chamado via ctypes, sem dependências).
+    wait() bloqueia sem gastar CPU até chegar um evento ou vencer o prazo e retorna
+    os nomes de arquivos criados, gravados ou movidos para a pasta; retorna None
+    quando a fila do kernel transbordou e a pasta precisa ser relistada.
+    Como no armazenamento compartilhado do Android (FUSE) os eventos gerados por
+    outros apps podem nunca chegar, wait() também retorna None a cada
+    'relist_interval' segundos, forçando uma relistagem de segurança.
+    """
+
+    _IN_CLOSE_WRITE = 0x00000008
+    _IN_MOVED_TO = 0x00000080
+    _IN_CREATE = 0x00000100
+    _IN_Q_OVERFLOW = 0x00004000
+    _IN_ISDIR = 0x40000000
+    _EVENT_HEADER = struct.Struct('iIII') # wd, mask, cookie, len (seguido do nome)
+
+    def __init__(self, dir_path, relist_interval=WATCH_POLL_MAX_INTERVAL):
+        libc = ctypes.CDLL(None, use_errno=True)
+        fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            error = ctypes.get_errno()
+            raise OSError(error, os.strerror(error))
+        mask = self._IN_CLOSE_WRITE | self._IN_MOVED_TO | self._IN_CREATE
+        if libc.inotify_add_watch(fd, os.fsencode(dir_path), mask) < 0:
+            error = ctypes.get_errno()
+            os.close(fd)
+            raise OSError(error, os.strerror(error), dir_path)
+        self._fd = fd
+        self._relist_interval = relist_interval
+        self._next_relist = time.monotonic() + relist_interval
+
+    def wait(self, timeout=None):
+        until_relist = max(self._next_relist - time.monotonic(), 0.0)
+        readable, _, _ = select.select([self._fd], [], [], until_relist if timeout is None else min(timeout, until_relist))
+        if not readable:
+            if time.monotonic() < self._next_relist:
+                return set()
+            self._next_relist = time.monotonic() + self._relist_interval
+            return None
+
+        names = set()
+        overflow = False
+        while True:
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(data):
+                _, mask, _, name_length = self._EVENT_HEADER.unpack_from(data, offset)
+                offset += self._EVENT_HEADER.size
+                name = os.fsdecode(data[offset:offset + name_length].rstrip(b'\0'))
+                offset += name_length
+                if mask & self._IN_Q_OVERFLOW:
+                    overflow = True
+                elif name and not mask & self._IN_ISDIR:
+                    names.add(name)
+        if overflow:
+            self._next_relist = time.monotonic() + self._relist_interval
+            return None
+        return names
+
+    def close(self):
+        os.close(self._fd)
+
+class PollingWatcher:
+    """
+    Alternativa ao inotify (ex: armazenamento compartilhado do Android, onde os eventos
+    gerados por outros apps nem sempre chegam). Confere só a data de modificação da
+    pasta, com intervalo que dobra enquanto nada muda, até WATCH_POLL_MAX_INTERVAL.
+    wait() retorna None (relistar a pasta) quando ela mudou ou a cada intervalo
+    máximo; a relistagem periódica pega arquivos reescritos no lugar e mudanças
+    que caíram no mesmo instante da última conferência.
+    """
+
+    def __init__(self, dir_path, min_interval=WATCH_POLL_MIN_INTERVAL, max_interval=WATCH_POLL_MAX_INTERVAL):
+        self._dir_path = dir_path
+        self._min_interval = min_interval
+        self._max_interval = max_interval
+        self._interval = min_interval
+        self._last_mtime = os.stat(dir_path).st_mtime_ns
+
+    def wait(self, timeout=None):
+        time.sleep(self._interval if timeout is None else min(self._interval, timeout))
+        mtime = os.stat(self._dir_path).st_mtime_ns
+        if mtime != self._last_mtime:
+            self._last_mtime = mtime
+            self._interval = self._min_interval
+            return None
+        if self._interval >= self._max_interval:
+            return None
+        self._interval = min(self._interval * 2, self._max_interval)
+        return set()
+
+    def close(self):
+        pass
+
+def _is_watch_candidate(name):
+    """Indica se um nome da raiz pode ser organizado (não é oculto nem download em andamento)."""
+    return not name.startswith('.') and not name.lower().endswith(WATCH_PARTIAL_SUFFIXES)
+
+def _watch_entry(source_folder, name):
+    """Lê o estado atual de um arquivo da raiz como ScanEntry, ou None se ele sumiu ou não é um arquivo comum."""
+    path = os.path.join(source_folder, name)
+    try:
+        file_stat = os.stat(path, follow_symlinks=False)
+    except OSError:
+        return None
+    if not stat.S_ISREG(file_stat.st_mode):
+        return None
+    return ScanEntry(name, path, False, True, file_stat.st_size, file_stat.st_mtime,
+                     file_stat.st_ino, CLASSIFIER.extension_of(name))
+
+def watch_downloads(workers=DEFAULT_MOVE_WORKERS, root=None, poll=False,
+                    stable_seconds=WATCH_STABLE_SECONDS, interactive=True, sniff=False):
+    """
+    Fica observando a raiz de Downloads e organiza cada arquivo por categoria
+    (Arquivos/<Categoria>/<Categoria>.<EXT>/) assim que o download termina,
+    até o Ctrl+C. Usa inotify quando disponível (ou polling com 'poll=True').
+    Um arquivo só é movido depois de 'stable_seconds' com tamanho e data parados;
+    downloads em andamento (.crdownload, .part...) e arquivos vazios ficam onde estão.
+    Pastas não são movidas, pois podem estar sendo preenchidas por outro app.
+    Os arquivos que já estavam na raiz ao iniciar também são organizados.
+    Com 'sniff', arquivos sem extensão conhecida são classificados pelo conteúdo.
+    Retorna um dicionário com o resumo da operação.
+    """
+    source_folder = root or get_downloads_path()
+    summary = {'operation': 'watch', 'root': source_folder, 'dry_run': False}
+
+    if not os.path.exists(source_folder):
+        print(f"Erro: A pasta de Downloads não foi encontrada em '{source_folder}'.")
+        print("Certifique-se de ter executado 'termux-setup-storage' e concedido as permissões necessárias.")
+        pause(interactive)
+        return dict(summary, status='error')
+
+    watcher = None
+    if not poll:
+        try:
+            watcher = InotifyWatcher(source_folder)
+        except (OSError, AttributeError) as e:
+            print(f"inotify indisponível ({e}); usando polling.")
+    if watcher is None:
+        watcher = PollingWatcher(source_folder)
+    mode = 'inotify' if isinstance(watcher, InotifyWatcher) else 'polling'
+    print(f"\n--- Observando '{source_folder}' ({mode}). Pressione Ctrl+C para parar. ---")
+
+    log_path = PROGRESS_SETTINGS['log_path']
+    log_file = open(log_path, 'a', encoding='utf-8', buffering=1) if log_path else None
+
+    def report(message):
+        line = f"[{datetime.datetime.now():%H:%M:%S}] {message}"
+        print(line, flush=True)
+        if log_file is not None:
+            log_file.write(line + "\n")
+
+    pending = {}  # nome -> (ScanEntry da última leitura, instante em que tamanho/data mudaram)
+    settled = {}  # nome -> (tamanho, data) dos arquivos deixados na raiz (vazios ou com erro)
+    ensurer = DirectoryEnsurer()
+    moved_files_count = {}
+    error_count = 0
+    changed = None # A primeira volta lista a raiz
+
+    def removal_failed(source, error):
+        nonlocal error_count
+        report(removal_error_message(source, error))
+        entry = _watch_entry(source_folder, os.path.basename(source))
+        if entry is not None: # O original continua na raiz: não é movido de novo
+            settled[entry.name] = (entry.size, entry.mtime)
+        error_count += 1
+
+    try:
+        while True:
+            if changed is None:
+                changed = {entry.name for entry in scan_directory(source_folder, with_stat=False) if entry.is_file}
+            for name in changed:
+                if _is_watch_candidate(name):
+                    pending.setdefault(name, None)
+
+            now = time.monotonic()
+            ready = []
+            for name, previous in list(pending.items()):
+                entry = _watch_entry(source_folder, name)
+                if entry is None or settled.get(name) == (entry.size, entry.mtime):
+                    del pending[name]
+                    if entry is None:
+                        settled.pop(name, None)
+                elif previous is None or (previous[0].size, previous[0].mtime) != (entry.size, entry.mtime):
+                    pending[name] = (entry, now)
+                elif now - previous[1] >= stable_seconds:
+                    del pending[name]
+                    if entry.size == 0:
+                        settled[name] = (entry.size, entry.mtime) # Fica para a limpeza (ou para ser escrito depois)
+                    else:
+                        ready.append(entry)
+
+            if ready:
+                plan = build_category_move_plan(source_folder, ready, sniff=sniff, workers=workers)
+                batch_failed = False
+                for result in execute_move_plan(plan, workers, ensurer=ensurer, on_removal_error=removal_failed):
+                    action = result.action
+                    item_name = os.path.basename(action.source)
+                    if result.error is not None:
+                        report(f"Erro ao mover arquivo '{item_name}': {result.error}")
+                        entry = _watch_entry(source_folder, item_name)
+                        if entry is not None:
+                            settled[item_name] = (entry.size, entry.mtime)
+                        error_count += 1
+                        batch_failed = True
+                    else:
+                        report(f"Movido arquivo: '{item_name}' para '{os.path.relpath(os.path.dirname(result.destination), source_folder)}/'")
+                        moved_files_count[action.category] = moved_files_count.get(action.category, 0) + 1
+                if batch_failed:
+                    ensurer = DirectoryEnsurer() # Alguma pasta de destino pode ter sido apagada enquanto observávamos
+
+            changed = watcher.wait(stable_seconds if pending else None)
+    except KeyboardInterrupt:
+        print("\nObservação encerrada.")
+    finally:
+        watcher.close()
+        if log_file is not None:
+            log_file.close()
+
+    moved_total = sum(moved_files_count.values())
+    print(f"Arquivos organizados durante a observação: {moved_total}")
+    for category, count in sorted(moved_files_count.items()):
+        print(f"- {category}: {count} arquivos")
+    return dict(summary, status='ok', mode=mode, moved_files=dict(sorted(moved_files_count.items())), errors=error_count)
+
+
+# Arquivo a remover na limpeza, com o inode, o tamanho e o mtime vistos na varredura
+CleanCandidate = namedtuple('CleanCandidate', ['path', 'reason', 'size', 'inode', 'mtime'])
+
+class CleanCandidatesVisitor:
+    """
+    Visitante do ParallelWalker que entrega os arquivos vazios e temporários de cada
+    pasta, como listas de CleanCandidate de até CLEAN_BATCH_SIZE itens, para 'emit'
+    (ex: o put de uma fila limitada, ou o extend de uma lista).
+    """
+
+    def __init__(self, emit):
+        self._emit = emit
+
+    def visit(self, dir_path, entries):
+        found = []
+        for entry in entries:
+            if not entry.is_file:
+                continue
+            if entry.size == 0:
+                found.append(CleanCandidate(entry.path, "Vazio", entry.size, entry.inode, entry.mtime))
+            elif entry.extension in TEMP_EXTENSIONS:
+                found.append(CleanCandidate(entry.path, f"Temporário ({entry.extension})", entry.size,
+                                            entry.inode, entry.mtime))
+            if len(found) >= CLEAN_BATCH_SIZE:
+                self._emit(found)
+                found = []
+        if found:
+            self._emit(found)
+
+class _CleanWalkCancelled(Exception):
+    """Interrompe a varredura da limpeza quando quem consome os candidatos desiste."""
+
+def iter_clean_candidates(root_path, workers=WALK_WORKERS, visitors=()):
+    """
+    Gera um CleanCandidate para cada arquivo vazio ou temporário sob 'root_path',
+    sem acumulá-los: a varredura paralela roda em uma thread própria e entrega os lotes
+    por uma fila de até CLEAN_QUEUE_BATCHES lotes, esperando quando a fila está cheia.
+    'visitors' recebem a mesma varredura (ex: SizeVisitor). Os candidatos saem na
+    ordem em que as pastas são listadas.
+    """
+    batches = queue.Queue(maxsize=CLEAN_QUEUE_BATCHES)
+    cancelled = threading.Event()
+    failure = []
+
+    def put(item):
+        while True:
+            if cancelled.is_set():
+                raise _CleanWalkCancelled()
+            try:
+                batches.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def run_walk():
+        try:
+            ParallelWalker(workers).walk(root_path, (CleanCandidatesVisitor(put), *visitors))
+        except _CleanWalkCancelled:
+            return
+        except BaseException as e:
+            failure.append(e)
+        try:
+            put(None) # Fim da varredura
+        except _CleanWalkCancelled:
+            pass
+
+    walk_thread = threading.Thread(target=run_walk, daemon=True)
+    walk_thread.start()
+    try:
+        while True:
+            batch = batches.get()
+            if batch is None:
+                break
+            yield from batch
+        if failure:
+            raise failure[0]
+    finally:
+        cancelled.set() # Se o consumo parou antes do fim, as threads da varredura param também
+        walk_thread.join()
+
+class CleanCandidateSpill:
+    """
+    Lista de candidatos da prévia da limpeza gravada em disco (NDJSON em
+    get_app_data_path()), para que a exclusão use exatamente o que foi mostrado
+    sem guardar tudo na memória. Apague com close() quando terminar.
+    """
+
+    def __init__(self):
+        self.file_path = os.path.join(get_app_data_path(), f"limpeza_{os.getpid()}.ndjson")
+        self._file = open(self.file_path, 'w', encoding='utf-8')
+
+    def write(self, candidate):
+        self._file.write(json.dumps(candidate, ensure_ascii=False) + "\n")
+
+    def __iter__(self):
+        self._file.close()
+        with open(self.file_path, encoding='utf-8') as spill_file:
+            for line in spill_file:
+                yield CleanCandidate(*json.loads(line))
+
+    def close(self):
+        self._file.close()
+        with contextlib.suppress(OSError):
+            os.remove(self.file_path)
+
+def clean_candidate_unchanged(candidate):
+    """True se o arquivo ainda é o da varredura: mesmo inode, tamanho e mtime."""
+    try:
+        current = os.lstat(candidate.path)
+        if current.st_ino != candidate.inode:
+            return False
+        if stat.S_ISLNK(current.st_mode): # O tamanho e o mtime da varredura são os do alvo
+            current = os.stat(candidate.path)
+    except OSError:
+        return False
+    return current.st_size == candidate.size and current.st_mtime == candidate.mtime
+
+def batched(iterable, batch_size):
+    """Agrupa os itens de 'iterable' em listas de até 'batch_size' itens."""
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def delete_clean_candidates(candidates, root_path, batch_size=CLEAN_BATCH_SIZE, total=None, on_removed=None):
+    """
+    Remove os candidatos (CleanCandidate) em lotes de 'batch_size', mantendo apenas os
+    totais acumulados. Um arquivo que mudou desde a varredura (outro inode, tamanho ou
+    mtime, como um download que acabou de começar) ou que sumiu é deixado de lado.
+    'total', se conhecido (pela prévia), permite mostrar porcentagem e tempo restante.
+    'on_removed(caminho)' é chamado para cada arquivo efetivamente removido.
+    Retorna (arquivos_removidos, bytes_liberados, erros, ignorados).
+    """
+    removed_count = 0
+    removed_size_total = 0
+    error_count = 0
+    skipped_count = 0
+    progress = ProgressReporter(total, unit="arquivos")
+
+    for batch in batched(candidates, batch_size):
+        for candidate in batch:
+            f_path, reason, f_size = candidate.path, candidate.reason, candidate.size
+            if not clean_candidate_unchanged(candidate):
+                progress.log(f"Ignorado: {os.path.relpath(f_path, root_path)} (mudou ou sumiu depois da varredura)")
+                skipped_count += 1
+                continue
+            try:
+                os.remove(f_path)
+                removed_count += 1
+                removed_size_total += f_size
+                if on_removed is not None:
+                    on_removed(f_path)
+                progress.log(f"Removido: {os.path.relpath(f_path, root_path)} ({reason})")
+            except Exception as e:
+                progress.error(f"Erro ao remover '{os.path.relpath(f_path, root_path)}': {e}")
+                error_count += 1
+        progress.advance(len(batch), sum(candidate.size for candidate in batch))
+
+    progress.finish()
+    return removed_count, removed_size_total, error_count, skipped_count
+
+def clean_files(root=None, assume_yes=False, dry_run=False, interactive=True, batch_size=CLEAN_BATCH_SIZE,
+                walk_workers=WALK_WORKERS):
+    """
+    Identifica e oferece para remover arquivos vazios e temporários
+    dentro da pasta Downloads e suas subfolders organizadas.
+    Funciona como um fluxo (varredura paralela -> fila limitada de lotes -> exclusão)
+    com memória limitada: a prévia mostra só os primeiros candidatos e grava a lista completa
+    em disco (CleanCandidateSpill); depois da confirmação só essa lista é removida, e cada
+    arquivo é conferido antes. Com assume_yes=True não há prévia nem confirmação: tudo é
+    feito em uma única passada.
+    Retorna um dicionário com o resumo da operação.
+    """
+    downloads_path = root or get_downloads_path()
+    summary = {'operation': 'clean', 'root': downloads_path, 'dry_run': dry_run}
+
+    print(f"\n--- Analisando arquivos para limpeza em '{downloads_path}' ---")
+
+    spill = None
+    try:
+        if dry_run or not assume_yes:
+            spill = None if dry_run else CleanCandidateSpill()
+            result = _preview_clean(downloads_path, summary, spill, dry_run, interactive, assume_yes, walk_workers)
+            if result is not None:
+                return result
+            candidates = spill
+        else:
+            candidates = iter_clean_candidates(downloads_path, walk_workers)
+
+        print("\nIniciando limpeza...")
+        with PROFILER.phase('remoção'): # Sem prévia, inclui a varredura, que alimenta os lotes em fluxo
+            removed_count, removed_size_total, error_count, skipped_count = delete_clean_candidates(
+                candidates, downloads_path, batch_size, summary.get('candidates'))
+    finally:
+        if spill is not None:
+            spill.close()
+
+    print(f"\nLimpeza concluída! {removed_count} arquivos foram removidos.")
+    if skipped_count:
+        print(f"{skipped_count} arquivos mudaram depois da varredura e foram mantidos.")
+    print(f"Espaço total liberado: {convert_bytes(removed_size_total)}.")
+    pause(interactive)
+    return dict(summary, status='ok', removed=removed_count, freed_bytes=removed_size_total, errors=error_count,
+                skipped=skipped_count)
+
+def _preview_clean(downloads_path, summary, spill, dry_run, interactive, assume_yes, walk_workers):
+    """
+    Prévia e confirmação da limpeza: mostra os primeiros candidatos, grava todos em
+    'spill' (se houver) e completa 'summary'. Retorna o resultado final da operação
+    quando ela termina aqui (nada a fazer, simulação ou cancelamento), senão None.
+    """
+    total_count = 0
+    total_size_to_clean = 0
+
+    sizes = SizeVisitor()
+    with PROFILER.phase('prévia'): # Inclui a varredura, que alimenta a prévia em fluxo
+        for candidate in iter_clean_candidates(downloads_path, walk_workers, (sizes,)):
+            total_count += 1
+            total_size_to_clean += candidate.size
+            if spill is not None:
+                spill.write(candidate)
+            if total_count == 1:
+                print("\n--- Arquivos detectados para limpeza: ---")
+            if total_count <= CLEAN_PREVIEW_LIMIT:
+                relative_path = os.path.relpath(candidate.path, downloads_path)
+                print(f"{total_count}. {relative_path} (Motivo: {candidate.reason}, "
+                      f"Tamanho: {convert_bytes(candidate.size)})")
+
+    summary.update(scanned_files=sizes.files, scanned_bytes=sizes.bytes,
+                   candidates=total_count, candidate_bytes=total_size_to_clean)
+
+    if total_count == 0:
+        print("Nenhum arquivo vazio ou temporário encontrado para limpeza.")
+        pause(interactive)
+        return dict(summary, status='nothing_to_do')
+
+    if total_count > CLEAN_PREVIEW_LIMIT:
+        print(f"... e mais {total_count - CLEAN_PREVIEW_LIMIT} arquivos.")
+    print(f"\n{sizes.files} arquivos analisados ({convert_bytes(sizes.bytes)}).")
+    print(f"\nTotal de {total_count} arquivos a serem removidos, totalizando {convert_bytes(total_size_to_clean)}.")
+
+    if dry_run:
+        print("\nSimulação: nada foi removido.")
+        pause(interactive)
+        return dict(summary, status='ok')
+
+    if not confirm("\nDigite 'limpar' para confirmar a exclusão: ", 'limpar', assume_yes):
+        print("Limpeza cancelada. Nada foi removido.")
+        pause(interactive)
+        return dict(summary, status='cancelled')
+
+    return None
+
+
+class EmptyFolderVisitor:
+    """Visitante do ParallelWalker que guarda quantos itens cada pasta listada tem."""
+
+    def __init__(self):
+        self.item_count = {}
+
+    def visit(self, dir_path, entries):
+        self.item_count[dir_path] = len(entries)
+
+    def cascade(self, root_path, protected=frozenset(), removed_files=()):
+        """
+        Propaga o "vazio" de baixo para cima: uma pasta entra na cascata quando todos os
+        seus itens são pastas que também entraram. A raiz, as pastas em 'protected' e as
+        que não puderam ser listadas nunca entram. Os arquivos de 'removed_files' (já
+        excluídos depois da varredura) são descontados. Retorna as filhas antes das mães.
+        """
+        item_count = dict(self.item_count)
+        for file_path in removed_files:
+            parent = os.path.dirname(file_path)
+            if parent in item_count:
+                item_count[parent] -= 1
+        empty_children = {}
+        cascade = []
+        for dir_path in sorted(item_count, key=lambda path: (-path.count(os.sep), path)):
+            if dir_path == root_path or dir_path in protected:
+                continue
+            if item_count[dir_path] == empty_children.get(dir_path, 0):
+                cascade.append(dir_path)
+                parent = os.path.dirname(dir_path)
+                empty_children[parent] = empty_children.get(parent, 0) + 1
+        return cascade
+
+def find_empty_folder_cascade(root_path, protected=frozenset(), workers=WALK_WORKERS):
+    """
+    Encontra, em uma única varredura (paralela, com 'workers' threads), todas as pastas
+    sob 'root_path' que ficam vazias depois de removidas as pastas vazias abaixo delas
+    (a cascata inteira). Retorna as pastas na ordem de remoção (filhas antes das mães).
+    """
+    visitor = EmptyFolderVisitor()
+    ParallelWalker(workers, with_stat=False).walk(root_path, (visitor,))
+    return visitor.cascade(root_path, protected)
+
+def remove_empty_folders(root=None, assume_yes=False, dry_run=False, interactive=True, walk_workers=WALK_WORKERS):
+    """
+    Identifica e oferece para remover pastas vazias dentro da pasta Downloads e suas subpastas,
+    incluindo as que só contêm outras pastas vazias, tudo em uma única passada.
+    Exclui pastas de destino do próprio organizador.
+    Retorna um dicionário com o resumo da operação.
+    """
+    downloads_path = root or get_downloads_path()
+    summary = {'operation': 'prune-empty', 'root': downloads_path, 'dry_run': dry_run}
+
+    print(f"\n--- Analisando pastas vazias em '{downloads_path}' ---")
+
+    with PROFILER.phase('listagem'):
+        empty_folders_found = find_empty_folder_cascade(downloads_path, CLASSIFIER.protected_paths(downloads_path),
+                                                        walk_workers)
+
+    summary['empty_folders'] = len(empty_folders_found)
+
+    if not empty_folders_found:
+        print("Nenhuma pasta vazia encontrada para remoção.")
+        pause(interactive)
+        return dict(summary, status='nothing_to_do')
+
+    with PROFILER.phase('prévia'):
+        print("\n--- Pastas vazias detectadas para remoção: ---")
+        for i, folder_path in enumerate(empty_folders_found):
+            relative_path = os.path.relpath(folder_path, downloads_path)
+            print(f"{i+1}. {relative_path}/")
+
+    if dry_run:
+        print("\nSimulação: nada foi removido.")
+        pause(interactive)
+        return dict(summary, status='ok')
+
+    if not confirm("\nDigite 'remover' para confirmar a exclusão destas pastas: ", 'remover', assume_yes):
+        print("Remoção de pastas vazias cancelada. Nada foi removido.")
+        pause(interactive)
+        return dict(summary, status='cancelled')
+
+    print("\nIniciando remoção de pastas vazias...")
+    with PROFILER.phase('remoção'):
+        removed_count, error_count = remove_folder_cascade(empty_folders_found, downloads_path)
+    
+    print(f"\nRemoção de pastas vazias concluída! {removed_count} pastas foram removidas.")
+    pause(interactive)
+    return dict(summary, status='ok', removed=removed_count, errors=error_count)
+
+
+# --- Manutenção completa em uma única varredura ---
+
+class RootEntriesVisitor:
+    """Visitante do ParallelWalker que guarda os itens (não ocultos) da raiz, para o plano de organização."""
+
+    def __init__(self, root_path):
+        self.root_path = root_path
+        self.entries = []
+
+    def visit(self, dir_path, entries):
+        if dir_path == self.root_path:
+            self.entries = [entry for entry in entries if not entry.name.startswith('.')]
+
+def plan_maintenance(root_path, root_entries, folders, removed_paths):
+    """
+    Planeja a organização e a remoção de pastas de uma manutenção, a partir da varredura
+    única ('root_entries' da raiz e o EmptyFolderVisitor 'folders'), supondo removidos
+    os arquivos de 'removed_paths'. Pastas da raiz que ficam vazias são removidas em
+    vez de organizadas, e pastas que vão receber arquivos saem da lista de remoção.
+    Retorna (plano de organização, pastas vazias na ordem de remoção).
+    """
+    cascade = folders.cascade(root_path, CLASSIFIER.protected_paths(root_path), removed_paths)
+
+    cascade_set = set(cascade)
+    entries = [entry for entry in root_entries
+               if entry.path not in removed_paths and entry.path not in cascade_set]
+    plan = build_category_move_plan(root_path, entries=entries)
+
+    receiving = set() # Pastas de destino do plano e todas as acima delas
+    for action in plan:
+        dir_path = os.path.dirname(action.destination)
+        while len(dir_path) > len(root_path) and dir_path not in receiving:
+            receiving.add(dir_path)
+            dir_path = os.path.dirname(dir_path)
+    return plan, [dir_path for dir_path in cascade if dir_path not in receiving]
+
+def remove_folder_cascade(folders, root_path):
+    """
+    Remove as pastas de 'folders' (filhas antes das mães). Se uma pasta não pode ser
+    removida (ganhou itens desde a varredura), as pastas acima dela são mantidas.
+    Retorna (pastas_removidas, erros).
+    """
+    removed_count = 0
+    error_count = 0
+    kept_folders = set() # Pastas que ganharam itens desde a varredura (e todas as acima delas)
+    for folder_path in folders:
+        if folder_path in kept_folders:
+            continue
+        try:
+            os.rmdir(folder_path)
+            print(f"Removido: {os.path.relpath(folder_path, root_path)}/")
+            removed_count += 1
+        except Exception as e:
+            print(f"Erro ao remover '{os.path.relpath(folder_path, root_path)}/': {e}")
+            error_count += 1
+            parent = os.path.dirname(folder_path)
+            while len(parent) > len(root_path) and parent not in kept_folders:
+                kept_folders.add(parent)
+                parent = os.path.dirname(parent)
+    return removed_count, error_count
+
+def run_maintenance(workers=DEFAULT_MOVE_WORKERS, root=None, assume_yes=False, dry_run=False, interactive=True,
+                    batch_size=CLEAN_BATCH_SIZE, walk_workers=WALK_WORKERS):
+    """
+    Limpeza, organização por categoria e remoção de pastas vazias (opções 2, 1 e 3 do
+    menu) com uma única varredura de Downloads: o ParallelWalker entrega cada pasta
+    aos visitantes de arquivos vazios/temporários, de contagem de itens e de itens da
+    raiz. As ações rodam na ordem em que uma não atrapalha a outra: primeiro as
+    exclusões, depois as movimentações (com diário) e por último a remoção das pastas
+    que ficaram vazias, recalculada sem nova varredura a partir do que foi excluído e
+    movido. Retorna um dicionário com o resumo da operação.
+    """
+    root_path = root or get_downloads_path()
+    summary = {'operation': 'maintenance', 'root': root_path, 'dry_run': dry_run}
+
+    if not os.path.exists(root_path):
+        print(f"Erro: A pasta de Downloads não foi encontrada em '{root_path}'.")
+        print("Certifique-se de ter executado 'termux-setup-storage' e concedido as permissões necessárias.")
+        pause(interactive)
+        return dict(summary, status='error')
+
+    print(f"\n--- Analisando '{root_path}' para a manutenção ---")
+    candidates = [] # A manutenção precisa de todos os candidatos para planejar as outras etapas
+    folders = EmptyFolderVisitor()
+    root_visitor = RootEntriesVisitor(root_path)
+    with PROFILER.phase('listagem'):
+        ParallelWalker(walk_workers).walk(root_path, (CleanCandidatesVisitor(candidates.extend), folders, root_visitor))
+
+    # Prévia supondo que todas as exclusões dão certo
+    with PROFILER.phase('plano'):
+        plan, empty_folders = plan_maintenance(root_path, root_visitor.entries, folders,
+                                               {candidate.path for candidate in candidates})
+    candidate_bytes = sum(candidate.size for candidate in candidates)
+    print(f"Arquivos vazios/temporários a remover: {len(candidates)} ({convert_bytes(candidate_bytes)})")
+    print(f"Itens da raiz a organizar: {len(plan)}")
+    print(f"Pastas vazias a remover: {len(empty_folders)}")
+    summary.update(candidates=len(candidates), candidate_bytes=candidate_bytes,
+                   planned_moves=len(plan), empty_folders=len(empty_folders))
+
+    if not candidates and not plan and not empty_folders:
+        print("Nada a fazer: Downloads já está limpa e organizada.")
+        pause(interactive)
+        return dict(summary, status='nothing_to_do')
+
+    if dry_run:
+        print("\nSimulação: nada foi modificado.")
+        pause(interactive)
+        return dict(summary, status='ok')
+
+    if not confirm("\nDigite 'confirmar' para iniciar a manutenção: ", 'confirmar', assume_yes):
+        print("Manutenção cancelada. Nada foi modificado.")
+        pause(interactive)
+        return dict(summary, status='cancelled')
+
+    # 1. Exclusões
+    removed_paths = set()
+    removed_count = freed_bytes = clean_errors = 0
+    if candidates:
+        print("\nRemovendo arquivos vazios e temporários...")
+        with PROFILER.phase('remoção'):
+            removed_count, freed_bytes, clean_errors, _ = delete_clean_candidates(
+                candidates, root_path, batch_size, len(candidates), on_removed=removed_paths.add)
+
+    # 2. Movimentações, replanejadas só se alguma exclusão falhou
+    if len(removed_paths) != len(candidates):
+        with PROFILER.phase('plano'):
+            plan, empty_folders = plan_maintenance(root_path, root_visitor.entries, folders, removed_paths)
+    moved_folders = {} # Pasta da raiz -> onde ela foi parar
+    move_summary = {'moved_files': {}, 'moved_folders': 0, 'errors': 0}
+    if plan:
+        print("\nOrganizando os itens da raiz...")
+
+        def remember_folder(result):
+            if result.error is None and result.action.is_dir:
+                moved_folders[result.action.source] = result.destination
+
+        journal = MoveJournal.create('maintenance', root_path)
+        with PROFILER.phase('execução'):
+            move_summary = run_category_move_plan(plan, workers, journal, on_result=remember_folder)
+
+    # 3. Pastas vazias, acompanhando as pastas da raiz que foram movidas inteiras
+    pruned_count = prune_errors = 0
+    if empty_folders:
+        print("\nRemovendo pastas vazias...")
+        prefix_length = len(os.path.join(root_path, ''))
+        current_paths = []
+        for folder_path in empty_folders:
+            top_level = folder_path[prefix_length:].split(os.sep, 1)
+            new_top = moved_folders.get(os.path.join(root_path, top_level[0]))
+            current_paths.append(folder_path if new_top is None or len(top_level) == 1
+                                 else os.path.join(new_top, top_level[1]))
+        with PROFILER.phase('poda'):
+            pruned_count, prune_errors = remove_folder_cascade(current_paths, root_path)
+
+    error_count = clean_errors + move_summary['errors'] + prune_errors
+    print(f"\nManutenção concluída! {removed_count} arquivos removidos ({convert_bytes(freed_bytes)}), "
+          f"{sum(move_summary['moved_files'].values())} arquivos e {move_summary['moved_folders']} pastas organizados, "
+          f"{pruned_count} pastas vazias removidas, {error_count} erros.")
+    pause(interactive)
+    return dict(summary, status='ok', removed=removed_count, freed_bytes=freed_bytes,
+                moved_files=move_summary['moved_files'], moved_folders=move_summary['moved_folders'],
+                pruned=pruned_count, errors=error_count)
+
+
+# --- Nomes das pastas por data ---
+
+DATE_OUTPUT_FOLDER = 'Organizado_Por_Data'
+
+# Nomes dos meses por idioma, fixos: não dependem do locale do processo (que no Termux
+# às vezes alterna entre inglês e português e separava o mesmo mês em duas pastas)
+MONTH_NAMES = {
+    'en': ('January', 'February', 'March', 'April', 'May', 'June',
+           'July', 'August', 'September', 'October', 'November', 'December'),
+    'pt_BR': ('Janeiro', 'Fevereiro', 'Março', 'Abril', 'Maio', 'Junho',
+              'Julho', 'Agosto', 'Setembro', 'Outubro', 'Novembro', 'Dezembro'),
+}
+# Inglês é o que o strftime("%B") gerava no locale padrão do Termux
+DEFAULT_DATE_LOCALE = 'en'
+
+_MONTH_FOLDER_PATTERN = re.compile(r'^(\d{2}) - (.+)$')
+# Nome do mês (em minúsculas, qualquer idioma) -> número do mês
+_KNOWN_MONTH_NAMES = {name.casefold(): month for names in MONTH_NAMES.values()
+                      for month, name in enumerate(names, start=1)}
+
+class DateFolderNamer:
+    """
+    Nomes das pastas "MM - Mês" da organização por data, no idioma escolhido.
+    Os doze nomes são montados uma vez em configure(), e o caminho de cada
+    (pasta base, ano, mês) fica em cache, então o plano não formata nada por arquivo.
+    """
+
+    def __init__(self, locale=DEFAULT_DATE_LOCALE):
+        self.configure(locale)
+
+    def configure(self, locale):
+        """Troca o idioma dos nomes (uma das chaves de MONTH_NAMES). ValueError se for desconhecido."""
+        if locale not in MONTH_NAMES:
+            raise ValueError(f"idioma de meses desconhecido: {locale!r} (use {', '.join(sorted(MONTH_NAMES))})")
+        self.locale = locale
+        self._month_folders = tuple(f"{month:02d} - {name}"
+                                    for month, name in enumerate(MONTH_NAMES[locale], start=1))
+        self._paths = {}
+
+    def month_folder(self, month):
+        """Nome da pasta do mês (1-12). Ex: "06 - June"."""
+        return self._month_folders[month - 1]
+
+    def path(self, base_folder, year, month):
+        """Retorna (caminho da pasta do mês, categoria "ano/MM - Mês") sob 'base_folder'."""
+        key = (base_folder, year, month)
+        cached = self._paths.get(key)
+        if cached is None:
+            month_folder = self._month_folders[month - 1]
+            cached = (os.path.join(base_folder, str(year), month_folder), f"{year}/{month_folder}")
+            self._paths[key] = cached
+        return cached
+
+    @staticmethod
+    def parse_month_folder(folder_name):
+        """
+        Número do mês de uma pasta "MM - Mês" criada em qualquer um dos idiomas conhecidos
+        (sem diferenciar maiúsculas, como o "março" do locale pt_BR), ou None se o nome
+        não for de uma pasta de mês ou se o número não bater com o nome.
+        """
+        match = _MONTH_FOLDER_PATTERN.match(folder_name)
+        if match is None:
+            return None
+        month = int(match.group(1))
+        return month if _KNOWN_MONTH_NAMES.get(match.group(2).casefold()) == month else None
+
+DATE_FOLDERS = DateFolderNamer()
+
+# --- Datas de captura (EXIF / MP4) para a organização por data ---
+
+# Segundos entre 1904-01-01 (época dos relógios MP4/QuickTime) e 1970-01-01
+MP4_EPOCH_OFFSET = 2082844800
+# Tags EXIF com data, em ordem de preferência: DateTimeOriginal, DateTimeDigitized, DateTime
+_EXIF_DATE_TAGS = (0x9003, 0x9004, 0x0132)
+_EXIF_IFD_POINTER = 0x8769
+
+def _parse_exif_datetime(raw):
+    """Converte 'AAAA:MM:DD HH:MM:SS' (hora local da câmera) em timestamp, ou None se inválida."""
+    try:
+        taken = datetime.datetime.strptime(raw.rstrip(b'\x00 ').decode('ascii'), '%Y:%m:%d %H:%M:%S')
+    except (UnicodeDecodeError, ValueError):
+        return None
+    return taken.timestamp() if taken.year >= 1900 else None
+
+def _tiff_capture_timestamp(data):
+    """Procura as datas EXIF em um bloco TIFF ('II*\\0' ou 'MM\\0*') já lido na memória."""
+    if data[:4] == b'II*\x00':
+        order = '<'
+    elif data[:4] == b'MM\x00*':
+        order = '>'
+    else:
+        return None
+
+    def read_ifd(offset):
+        tags = {}
+        if offset + 2 > len(data):
+            return tags
+        (count,) = struct.unpack_from(order + 'H', data, offset)
+        for position in range(offset + 2, min(offset + 2 + count * 12, len(data) - 11), 12):
+            tag, kind, length, value = struct.unpack_from(order + 'HHII', data, position)
+            tags[tag] = (kind, length, value, position + 8)
+        return tags
+
+    ifd0 = read_ifd(struct.unpack_from(order + 'I', data, 4)[0])
+    found = dict(ifd0)
+    if _EXIF_IFD_POINTER in ifd0:
+        found.update(read_ifd(ifd0[_EXIF_IFD_POINTER][2]))
+    for tag in _EXIF_DATE_TAGS:
+        entry = found.get(tag)
+        if entry is None or entry[0] != 2 or entry[1] < 19: # ASCII com ao menos "AAAA:MM:DD HH:MM:SS"
+            continue
+        start = entry[2] if entry[1] > 4 else entry[3]
+        taken = _parse_exif_datetime(data[start:start + entry[1]])
+        if taken is not None:
+            return taken
+    return None
+
+def _jpeg_capture_timestamp(f):
+    """Lê só os segmentos do cabeçalho do JPEG até achar o APP1 com o bloco EXIF."""
+    if f.read(2) != b'\xff\xd8':
+        return None
+    for _ in range(32):
+        header = f.read(4)
+        if len(header) < 4 or header[0] != 0xFF:
+            return None
+        marker, length = header[1], struct.unpack('>H', header[2:])[0]
+        if marker in (0xDA, 0xD9): # Início da imagem comprimida / fim do arquivo: não há EXIF
+            return None
+        if marker == 0xE1:
+            segment = f.read(length - 2)
+            if segment.startswith(b'Exif\x00\x00'):
+                return _tiff_capture_timestamp(segment[6:])
+        else:
+            f.seek(length - 2, os.SEEK_CUR)
+    return None
+
+def _mp4_capture_timestamp(f):
+    """Percorre só os cabeçalhos das caixas MP4/MOV até o 'mvhd' dentro do 'moov' (que pode estar no fim)."""
+    file_size = f.seek(0, os.SEEK_END)
+    position = 0
+    for _ in range(64):
+        if position + 8 > file_size:
+            return None
+        f.seek(position)
+        header = f.read(16)
+        box_size, kind = struct.unpack('>I4s', header[:8])
+        header_size = 8
+        if box_size == 1:
+            box_size, header_size = struct.unpack('>Q', header[8:16])[0], 16
+        elif box_size == 0:
+            box_size = file_size - position
+        if box_size < header_size:
+            return None
+
+        if kind == b'moov':
+            child = position + header_size
+            end = position + box_size
+            while child + 8 <= end:
+                f.seek(child)
+                child_size, child_kind = struct.unpack('>I4s', f.read(8))
+                if child_kind == b'mvhd':
+                    body = f.read(12)
+                    if body[:1] == b'\x01':
+                        created = struct.unpack('>Q', body[4:12])[0]
+                    else:
+                        created = struct.unpack('>I', body[4:8])[0]
+                    return created - MP4_EPOCH_OFFSET if created > MP4_EPOCH_OFFSET else None
+                if child_size < 8:
+                    return None
+                child += child_size
+            return None
+        position += box_size
+    return None
+
+def _tiff_file_capture_timestamp(f):
+    return _tiff_capture_timestamp(f.read(64 * 1024))
+
+# Extensão -> leitor da data de captura (recebe o arquivo aberto em modo binário)
+CAPTURE_DATE_READERS = {
+    '.jpg': _jpeg_capture_timestamp, '.jpeg': _jpeg_capture_timestamp,
+    '.tif': _tiff_file_capture_timestamp, '.tiff': _tiff_file_capture_timestamp,
+    '.mp4': _mp4_capture_timestamp, '.mov': _mp4_capture_timestamp,
+    '.3gp': _mp4_capture_timestamp, '.m4a': _mp4_capture_timestamp,
+}
+
+def read_capture_timestamp(file_path, extension):
+    """
+    Data de captura (timestamp) gravada no cabeçalho de fotos e vídeos, ou None se não
+    houver ou se estiver fora do intervalo plausível (de 1970 até amanhã), como nos
+    arquivos corrompidos; nesses casos vale a data de modificação.
+    """
+    reader = CAPTURE_DATE_READERS.get(extension)
+    if reader is None:
+        return None
+    try:
+        with open(file_path, 'rb') as f:
+            taken = reader(f)
+    except (OSError, struct.error, IndexError):
+        return None
+    if taken is None or not 0 <= taken <= time.time() + 86400:
+        return None
+    return taken
+
+def resolve_capture_timestamps(entries, workers=DEFAULT_MOVE_WORKERS):
+    """
+    Data de cada ScanEntry para a organização por data: a de captura (EXIF/MP4),
+    lida em paralelo por 'workers' threads, ou a de modificação quando não houver.
+    Retorna a lista de timestamps na mesma ordem de 'entries'.
+    """
+    timestamps = [entry.mtime for entry in entries]
+    media = [(index, entry) for index, entry in enumerate(entries)
+             if entry.size > 0 and entry.extension in CAPTURE_DATE_READERS]
+    if media:
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            taken_list = executor.map(read_capture_timestamp, [entry.path for _, entry in media],
+                                      [entry.extension for _, entry in media])
+            for (index, _), taken in zip(media, taken_list):
+                if taken is not None:
+                    timestamps[index] = taken
+    return timestamps
+
+def _local_month(timestamp):
+    """(ano, mês) local de um timestamp, ou None se o sistema não consegue convertê-lo."""
+    try:
+        converted = datetime.datetime.fromtimestamp(timestamp)
+        datetime.datetime(converted.year, converted.month, 1).timestamp()
+    except (OverflowError, OSError, ValueError):
+        return None
+    return converted.year, converted.month
+
+def bucket_by_month(timestamps):
+    """
+    (ano, mês) no horário local de cada timestamp, de uma vez: monta os inícios de
+    mês do intervalo coberto e localiza todos os timestamps entre eles com uma busca
+    binária (vetorizada com NumPy, quando disponível), sem converter data a data.
+    Timestamps que o sistema não converte (ex: data de modificação corrompida) ficam com None.
+    """
+    if not timestamps:
+        return []
+    first, last = _local_month(min(timestamps)), _local_month(max(timestamps))
+    if first is None or last is None:
+        # Só os extremos são convertidos: separa os inválidos e agrupa os demais normalmente
+        valid = [timestamp for timestamp in timestamps if _local_month(timestamp) is not None]
+        buckets = iter(bucket_by_month(valid))
+        return [next(buckets) if _local_month(timestamp) is not None else None for timestamp in timestamps]
+
+    months = []
+    month_starts = []
+    year, month = first
+    while (year, month) <= last:
+        months.append((year, month))
+        month_starts.append(datetime.datetime(year, month, 1).timestamp())
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+
+    if np is not None:
+        positions = np.searchsorted(np.asarray(month_starts), np.asarray(timestamps, dtype=float), side='right') - 1
+        return [months[position] for position in positions.tolist()]
+    return [months[bisect.bisect_right(month_starts, timestamp) - 1] for timestamp in timestamps]
+
+def build_date_move_plan(source_folder, workers=DEFAULT_MOVE_WORKERS):
+    """
+    Planeja a organização por data dos arquivos soltos em 'source_folder', pela data
+    de captura de fotos e vídeos (EXIF/MP4) ou, nos demais, pela de modificação.
+    A categoria de cada ação é a chave "ano/mês" usada no resumo.
+    """
+    date_output_base = os.path.join(source_folder, DATE_OUTPUT_FOLDER)
+    registry = NameRegistry()
+    plan = []
+
+    # Apenas arquivos soltos na raiz são movidos por data; pastas (inclusive as de
+    # destino do organizador) são ignoradas.
+    with PROFILER.phase('listagem'):
+        entries = [entry for entry in scan_directory(source_folder) if entry.is_file]
+    with PROFILER.phase('datas'):
+        timestamps = resolve_capture_timestamps(entries, workers)
+    with PROFILER.phase('agrupamento'):
+        months = bucket_by_month(timestamps)
+
+    for entry, year_month in zip(entries, months):
+        if year_month is None:
+            print(f"Data inválida em '{entry.name}': o arquivo fica onde está.")
+            continue
+        dest_month_path, category = DATE_FOLDERS.path(date_output_base, *year_month) # Ex: ".../2024/06 - June"
+        final_name = resolve_destination_name(registry, dest_month_path, entry.name)
+        plan.append(MoveAction(entry.path, os.path.join(dest_month_path, final_name),
+                               category, final_name, False, entry.size))
+
+    return tuple(plan)
+
+def organize_by_date(workers=DEFAULT_MOVE_WORKERS, root=None, assume_yes=False, dry_run=False, interactive=True):
+    """
+    Organiza arquivos na pasta Downloads em subpastas de ano e mês, pela data de captura
+    de fotos e vídeos (EXIF/MP4) ou pela data de modificação dos demais arquivos.
+    Retorna um dicionário com o resumo da operação.
+    """
+    source_folder = root or get_downloads_path()
+    summary = {'operation': 'by-date', 'root': source_folder, 'dry_run': dry_run}
+
+    if not os.path.exists(source_folder):
+        print(f"Erro: A pasta de Downloads não foi encontrada em '{source_folder}'.")
+        print("Certifique-se de ter executado 'termux-setup-storage' e concedido as permissões necessárias.")
+        pause(interactive)
+        return dict(summary, status='error')
+
+    print(f"\n--- Analisando arquivos para organização por data em '{source_folder}' ---")
+
+    with PROFILER.phase('plano'):
+        plan = build_date_move_plan(source_folder, workers)
+
+    if not plan:
+        print("Nenhum arquivo solto na pasta Downloads para organizar por data.")
+        pause(interactive)
+        return dict(summary, status='nothing_to_do')
+
+    with PROFILER.phase('prévia'):
+        print("\nArquivos detectados para organização por data:")
+        for action in plan:
+            print(f"- {os.path.basename(action.source)} -> {action.category}/")
+
+    if dry_run:
+        planned_by_year_month = {}
+        for action in plan:
+            planned_by_year_month[action.category] = planned_by_year_month.get(action.category, 0) + 1
+        print("\nSimulação: nada foi modificado.")
+        pause(interactive)
+        return dict(summary, status='ok', planned=planned_by_year_month)
+    
+    if not confirm("\nDigite 'confirmar' para iniciar a organização por data: ", 'confirmar', assume_yes):
+        print("Organização por data cancelada. Nada foi modificado.")
+        pause(interactive)
+        return dict(summary, status='cancelled')
+
+    print("\nIniciando organização por data...")
+
+    moved_count_by_year_month = {}
+    total_processed_files = 0
+    error_count = 0
+    progress = ProgressReporter(len(plan), unit="arquivos")
+
+    def removal_failed(source, error):
+        nonlocal error_count
+        progress.error(removal_error_message(source, error))
+        error_count += 1
+
+    journal = MoveJournal.create('by-date', source_folder)
+    with PROFILER.phase('execução'):
+        for result in execute_move_plan(plan, workers, on_bytes=progress.add_bytes, journal=journal,
+                                        on_removal_error=removal_failed):
+            action = result.action
+            file_name = os.path.basename(action.source)
+
+            if result.error is not None:
+                progress.error(f"Erro ao organizar '{file_name}' por data: {result.error}")
+                error_count += 1
+                progress.advance()
+                continue
+
+            if os.path.basename(result.destination) != file_name:
+                progress.log(f"Conflito: '{file_name}' renomeado para '{os.path.basename(result.destination)}'")
+            progress.log(f"Movido: '{file_name}' para '{action.category}/'")
+            total_processed_files += 1
+            moved_count_by_year_month[action.category] = moved_count_by_year_month.get(action.category, 0) + 1
+            progress.advance()
+
+    progress.finish()
+    print("\nOrganização por data concluída com sucesso!")
+    print(f"Total de {total_processed_files} arquivos processados na pasta Downloads.")
+
+    print("\n--- Resumo da Organização por Data ---")
+    if moved_count_by_year_month:
+        for ym, count in sorted(moved_count_by_year_month.items()):
+            print(f"- {ym}: {count} arquivos")
+    else:
+        print("Nenhum arquivo foi movido por data.")
+    print("--------------------------------------")
+    pause(interactive)
+    return dict(summary, status='ok', moved=moved_count_by_year_month, errors=error_count)
+
+def build_date_merge_plan(date_output_base):
+    """
+    Planeja a junção das pastas de mês duplicadas em 'date_output_base' (ex: "03 - March"
+    e "03 - Março" no mesmo ano) na pasta com o nome do idioma atual de DATE_FOLDERS.
+    Se a pasta certa ainda não existe e só há uma variante, a pasta inteira é renomeada
+    (uma única ação); senão, o conteúdo de cada variante é movido para a pasta certa,
+    com os conflitos de nome resolvidos já no plano.
+    Retorna (plano, pastas de mês que devem ficar vazias e ser removidas depois).
+    """
+    registry = NameRegistry()
+    plan = []
+    emptied_folders = []
+
+    for year_entry in sorted(scan_directory(date_output_base, with_stat=False), key=lambda e: e.name):
+        if not year_entry.is_dir or not (len(year_entry.name) == 4 and year_entry.name.isdigit()):
+            continue
+        folders_by_month = {}
+        for month_entry in scan_directory(year_entry.path, with_stat=False):
+            month = DATE_FOLDERS.parse_month_folder(month_entry.name) if month_entry.is_dir else None
+            if month is not None:
+                folders_by_month.setdefault(month, []).append(month_entry)
+
+        for month, folders in sorted(folders_by_month.items()):
+            canonical_path, category = DATE_FOLDERS.path(date_output_base, int(year_entry.name), month)
+            strays = sorted((folder for folder in folders if folder.path != canonical_path), key=lambda e: e.name)
+            if not strays:
+                continue
+            if len(strays) == 1 and len(folders) == 1:
+                plan.append(MoveAction(strays[0].path, canonical_path, category,
+                                       os.path.basename(canonical_path), True, 0))
+                continue
+            for stray in strays:
+                for child in sorted(scan_directory(stray.path, include_hidden=True), key=lambda e: e.name):
+                    final_name = resolve_destination_name(registry, canonical_path, child.name)
+                    plan.append(MoveAction(child.path, os.path.join(canonical_path, final_name), category,
+                                           final_name, child.is_dir, child.size))
+                emptied_folders.append(stray.path)
+
+    return tuple(plan), emptied_folders
+
+def merge_date_folders(workers=DEFAULT_MOVE_WORKERS, root=None, assume_yes=False, dry_run=False, interactive=True):
+    """
+    Junta, de uma vez, as pastas de mês de "Organizado_Por_Data" que ficaram separadas
+    por terem sido criadas com idiomas diferentes, usando os nomes do idioma atual.
+    As movimentações são renomeações em lote pelo mesmo executor (e diário) da organização.
+    Retorna um dicionário com o resumo da operação.
+    """
+    source_folder = root or get_downloads_path()
+    date_output_base = os.path.join(source_folder, DATE_OUTPUT_FOLDER)
+    summary = {'operation': 'merge-date-folders', 'root': source_folder, 'dry_run': dry_run,
+               'locale': DATE_FOLDERS.locale}
+
+    if not os.path.isdir(date_output_base):
+        print(f"Nenhuma pasta '{DATE_OUTPUT_FOLDER}' encontrada em '{source_folder}'.")
+        pause(interactive)
+        return dict(summary, status='nothing_to_do')
+
+    print(f"\n--- Procurando pastas de mês duplicadas em '{date_output_base}' ---")
+    plan, emptied_folders = build_date_merge_plan(date_output_base)
+
+    if not plan and not emptied_folders:
+        print(f"Todas as pastas de mês já usam os nomes em '{DATE_FOLDERS.locale}'. Nada a juntar.")
+        pause(interactive)
+        return dict(summary, status='nothing_to_do')
+
+    planned_by_month = {}
+    for action in plan:
+        planned_by_month[action.category] = planned_by_month.get(action.category, 0) + 1
+    for category, count in sorted(planned_by_month.items()):
+        print(f"- {category}: {count} itens")
+
+    if dry_run:
+        print("\nSimulação: nada foi modificado.")
+        pause(interactive)
+        return dict(summary, status='ok', planned=planned_by_month)
+
+    if not confirm("\nDigite 'confirmar' para juntar as pastas: ", 'confirmar', assume_yes):
+        print("Junção cancelada. Nada foi modificado.")
+        pause(interactive)
+        return dict(summary, status='cancelled')
+
+    moved_count = 0
+    error_count = 0
+    progress = ProgressReporter(len(plan))
+    journal = MoveJournal.create('merge-date-folders', source_folder) if plan else None
+
+    def removal_failed(source, error):
+        nonlocal error_count
+        progress.error(removal_error_message(source, error))
+        error_count += 1
+
+    for result in execute_move_plan(plan, workers, on_bytes=progress.add_bytes, journal=journal,
+                                    on_removal_error=removal_failed):
+        item_name = os.path.basename(result.action.source)
+        if result.error is not None:
+            progress.error(f"Erro ao mover '{item_name}': {result.error}")
+            error_count += 1
+        else:
+            progress.log(f"Movido: '{item_name}' para '{result.action.category}/'")
+            moved_count += 1
+        progress.advance()
+    progress.finish()
+
+    removed_folders = 0
+    for folder_path in emptied_folders:
+        try:
+            os.rmdir(folder_path)
+            removed_folders += 1
+        except OSError as e:
+            print(f"A pasta '{os.path.relpath(folder_path, source_folder)}' não foi removida: {e}")
+            error_count += 1
+
+    print(f"\nJunção concluída! {moved_count} itens movidos, {removed_folders} pastas duplicadas removidas, "
+          f"{error_count} erros.")
+    pause(interactive)
+    return dict(summary, status='ok', moved=moved_count, removed_folders=removed_folders, errors=error_count)
+
+
+# --- Retomar e desfazer a partir do diário ---
+
+def _is_finished_copy(source, destination):
+    """Indica se 'destination' é a cópia completa de 'source' (mesmo tamanho e data, que o copystat preserva)."""
+    try:
+        source_stat, dest_stat = os.lstat(source), os.lstat(destination)
+    except OSError:
+        return False
+    return (stat.S_ISREG(source_stat.st_mode) and stat.S_ISREG(dest_stat.st_mode)
+            and source_stat.st_size == dest_stat.st_size and source_stat.st_mtime_ns == dest_stat.st_mtime_ns)
+
+def resume_moves(workers=DEFAULT_MOVE_WORKERS, journal_path=None, assume_yes=False, interactive=True):
+    """
+    Retoma a última organização interrompida a partir do diário, sem varrer Downloads de novo.
+    Cada ação sem resultado registrado é conferida no disco: se a origem já sumiu e o
+    destino existe, ela já tinha sido feita; se origem e destino existem com o mesmo
+    tamanho e data, a cópia entre dispositivos terminou e só falta apagar o original.
+    O mesmo vale para as ações concluídas sem registro "X" (original apagado).
+    As demais são executadas e registradas no mesmo diário.
+    Retorna um dicionário com o resumo da operação.
+    """
+    summary = {'operation': 'resume', 'dry_run': False}
+    journal_path = journal_path or find_latest_journal()
+    journal = MoveJournal.load(journal_path) if journal_path else None
+    if journal is None or journal.finished:
+        print("Nenhuma organização interrompida para retomar.")
+        pause(interactive)
+        return dict(summary, status='nothing_to_do')
+    summary.update(journal=journal_path, root=journal.root)
+
+    print(f"\n--- Conferindo o diário '{os.path.basename(journal_path)}' ({journal.operation}) ---")
+    pending = []
+    finished_copies = []
+    already_done = 0
+    missing = 0
+
+    # Cópias entre dispositivos registradas, mas cujo original ainda não tinha sido apagado:
+    # as remoções acontecem na ordem de término, não na do plano, então todas são conferidas
+    for index in journal.done_order:
+        action = journal.actions[index]
+        if action.is_dir or index in journal.removed_sources:
+            continue
+        destination = journal.destination_of(index)
+        if _is_finished_copy(action.source, destination):
+            finished_copies.append((action.source, destination))
+
+    for index, action in sorted(journal.actions.items()):
+        if index in journal.status:
+            continue
+        source_exists = os.path.lexists(action.source)
+        if not source_exists and os.path.lexists(action.destination):
+            journal.completed(action, action.destination)
+            already_done += 1
+        elif not source_exists:
+            journal.failed(action, "origem não encontrada na retomada")
+            missing += 1
+        elif not action.is_dir and _is_finished_copy(action.source, action.destination):
+            finished_copies.append((action.source, action.destination))
+            journal.completed(action, action.destination)
+            already_done += 1
+        else:
+            pending.append(action)
+
+    error_count = 0
+    if finished_copies:
+        backend = MoveBackend(on_source_removed=journal.source_removed)
+        backend.sync_and_remove(finished_copies)
+        for source, error in backend.take_failed_removals():
+            print(removal_error_message(source, error))
+            error_count += 1
+
+    print(f"Já concluídas antes da interrupção: {already_done}")
+    print(f"Origens que não existem mais: {missing}")
+    print(f"Pendentes: {len(pending)}")
+    summary.update(already_done=already_done, missing=missing)
+
+    if not pending:
+        journal.finish()
+        print("Nada mais a mover; o diário foi encerrado.")
+        pause(interactive)
+        return dict(summary, status='ok', moved=0, errors=error_count)
+
+    if not confirm("\nDigite 'confirmar' para retomar as movimentações pendentes: ", 'confirmar', assume_yes):
+        journal.close()
+        print("Retomada cancelada. Nada foi modificado.")
+        pause(interactive)
+        return dict(summary, status='cancelled')
+
+    moved_count = 0
+    progress = ProgressReporter(len(pending))
+
+    def removal_failed(source, error):
+        nonlocal error_count
+        progress.error(removal_error_message(source, error))
+        error_count += 1
+
+    for result in execute_move_plan(tuple(pending), workers, on_bytes=progress.add_bytes, journal=journal,
+                                    on_removal_error=removal_failed):
+        item_name = os.path.basename(result.action.source)
+        if result.error is not None:
+            progress.error(f"Erro ao mover '{item_name}': {result.error}")
+            error_count += 1
+        else:
+            progress.log(f"Movido: '{item_name}' para '{os.path.dirname(result.destination)}/'")
+            moved_count += 1
+        progress.advance()
+    progress.finish()
+
+    print(f"\nRetomada concluída! {moved_count} itens movidos, {error_count} erros.")
+    pause(interactive)
+    return dict(summary, status='ok', moved=moved_count, errors=error_count)
+
+def undo_moves(journal_path=None, assume_yes=False, interactive=True):
+    """
+    Desfaz as movimentações do diário mais recente (ou de 'journal_path'), da última para
+    a primeira, devolvendo cada item ao caminho original. Num diário interrompido, as
+    ações sem resultado registrado cujo destino existe (e a origem não) também são desfeitas.
+    Retorna um dicionário com o resumo da operação.
+    """
+    summary = {'operation': 'undo', 'dry_run': False}
+    journal_path = journal_path or find_latest_journal()
+    if not journal_path:
+        print("Nenhum diário de movimentações encontrado.")
+        pause(interactive)
+        return dict(summary, status='nothing_to_do')
+    journal = MoveJournal.load(journal_path)
+    summary.update(journal=journal_path, root=journal.root)
+
+    to_undo = []
+    if not journal.finished:
+        for index, action in sorted(journal.actions.items(), reverse=True):
+            if index not in journal.status and not os.path.lexists(action.source) \
+                    and os.path.lexists(action.destination):
+                to_undo.append(index)
+    to_undo.extend(index for index in reversed(journal.done_order) if journal.status[index] == 'done')
+
+    if not to_undo:
+        print(f"Nada a desfazer no diário '{os.path.basename(journal_path)}'.")
+        pause(interactive)
+        return dict(summary, status='nothing_to_do')
+
+    print(f"\n--- Desfazendo '{os.path.basename(journal_path)}' ({journal.operation}): {len(to_undo)} itens ---")
+    if not confirm("\nDigite 'desfazer' para devolver os itens aos lugares originais: ", 'desfazer', assume_yes):
+        print("Nada foi desfeito.")
+        pause(interactive)
+        return dict(summary, status='cancelled')
+
+    restored_count = 0
+    error_count = 0
+    backend = MoveBackend()
+    ensurer = DirectoryEnsurer()
+    progress = ProgressReporter(len(to_undo))
+
+    def report_failed_removals():
+        nonlocal error_count
+        for source, error in backend.take_failed_removals():
+            progress.error(removal_error_message(source, error))
+            error_count += 1
+
+    try:
+        for index in to_undo:
+            action = journal.actions[index]
+            current_path = journal.destination_of(index) if index in journal.status else action.destination
+            try:
+                if os.path.lexists(action.source):
+                    raise FileExistsError(errno.EEXIST, "já existe um item no caminho original", action.source)
+                ensurer.ensure(os.path.dirname(action.source))
+                backend.move(current_path, action.source, progress.add_bytes)
+                journal.undone(index)
+                progress.log(f"Devolvido: '{os.path.basename(current_path)}' para '{action.source}'")
+                restored_count += 1
+            except OSError as e:
+                progress.error(f"Erro ao devolver '{os.path.basename(current_path)}': {e}")
+                error_count += 1
+            report_failed_removals()
+            progress.advance()
+    finally:
+        backend.flush()
+        report_failed_removals()
+        journal.finish()
+        progress.finish()
+
+    print(f"\nDesfeito! {restored_count} itens devolvidos, {error_count} erros.")
+    pause(interactive)
+    return dict(summary, status='ok', restored=restored_count, errors=error_count)
+
+
+# --- Arquivos duplicados ---
+
+def _hash_sample(file_path, file_size):
+    """Hash de uma amostra do arquivo: os primeiros e os últimos DUPLICATE_SAMPLE_SIZE bytes."""
+    with open(file_path, 'rb', buffering=0) as f:
+        sample = f.read(DUPLICATE_SAMPLE_SIZE)
+        if file_size > 2 * DUPLICATE_SAMPLE_SIZE:
+            f.seek(file_size - DUPLICATE_SAMPLE_SIZE)
+            sample += f.read(DUPLICATE_SAMPLE_SIZE)
+        elif file_size > DUPLICATE_SAMPLE_SIZE:
+            sample += f.read()
+    return hashlib.blake2b(sample, digest_size=16).hexdigest()
+
+def _hash_full(file_path, buffer):
+    """Hash do conteúdo inteiro, lido em blocos para dentro de 'buffer' (reaproveitado entre arquivos)."""
+    digest = hashlib.blake2b(digest_size=32)
+    view = memoryview(buffer)
+    with open(file_path, 'rb', buffering=0) as f:
+        while True:
+            read_size = f.readinto(buffer)
+            if not read_size:
+                break
+            digest.update(view[:read_size])
+    return digest.hexdigest()
+
+def find_duplicate_groups(root_path, conn):
+    """
+    Procura arquivos com conteúdo idêntico sob 'root_path' em três etapas:
+    agrupa por tamanho, depois por hash de uma amostra (início + fim) e só então
+    calcula o hash completo dos candidatos que sobraram. Os hashes ficam em cache
+    no índice, pela chave (inode, tamanho, mtime), e são reaproveitados nas próximas execuções.
+    Retorna uma lista de grupos (listas de ScanEntry), o mais antigo primeiro em cada grupo.
+    """
+    by_size = {}
+    for entry in scan_directory(root_path, recursive=True):
+        if entry.is_file and entry.size > 0:
+            by_size.setdefault(entry.size, []).append(entry)
+
+    cache_updates = {}
+
+    def cached_hashes(entry):
+        key = (entry.inode, entry.size, entry.mtime)
+        if key in cache_updates:
+            return cache_updates[key]
+        row = conn.execute("SELECT sample_hash, full_hash FROM hashes WHERE inode = ? AND size = ? AND mtime = ?",
+                           key).fetchone()
+        return list(row) if row else [None, None]
+
+    by_sample = {}
+    for size, entries in by_size.items():
+        if len(entries) < 2:
+            continue
+        seen_inodes = set()
+        for entry in entries:
+            if entry.inode in seen_inodes:
+                continue # Hardlinks do mesmo arquivo não são duplicados
+            seen_inodes.add(entry.inode)
+            hashes = cached_hashes(entry)
+            if hashes[0] is None:
+                try:
+                    hashes[0] = _hash_sample(entry.path, size)
+                except OSError as e:
+                    print(f"Erro ao ler '{entry.path}': {e}")
+                    continue
+                cache_updates[(entry.inode, entry.size, entry.mtime)] = hashes
+            by_sample.setdefault((size, hashes[0]), []).append(entry)
+
+    buffer = bytearray(DUPLICATE_READ_BUFFER)
+    by_full = {}
+    for (size, sample_hash), entries in by_sample.items():
+        if len(entries) < 2:
+            continue
+        for entry in entries:
+            if size <= 2 * DUPLICATE_SAMPLE_SIZE:
+                by_full.setdefault((size, sample_hash), []).append(entry) # A amostra já é o arquivo todo
+                continue
+            hashes = cached_hashes(entry)
+            if hashes[1] is None:
+                try:
+                    hashes[1] = _hash_full(entry.path, buffer)
+                except OSError as e:
+                    print(f"Erro ao ler '{entry.path}': {e}")
+                    continue
+                cache_updates[(entry.inode, entry.size, entry.mtime)] = hashes
+            by_full.setdefault((size, hashes[1]), []).append(entry)
+
+    if cache_updates:
+        with conn:
+            conn.executemany("INSERT OR REPLACE INTO hashes VALUES (?, ?, ?, ?, ?)",
+                             [(*key, sample_hash, full_hash) for key, (sample_hash, full_hash) in cache_updates.items()])
+
+    groups = [sorted(entries, key=lambda e: (e.mtime, e.path)) for entries in by_full.values() if len(entries) > 1]
+    groups.sort(key=lambda group: (-group[0].size, group[0].path))
+    return groups
+
+def resolve_duplicates(groups, action, root_path):
+    """
+    Aplica 'action' às cópias de cada grupo, mantendo o primeiro arquivo (o mais antigo):
+    'delete' apaga as cópias e 'hardlink' as substitui por links para o original.
+    Retorna (cópias_resolvidas, bytes_liberados).
+    """
+    resolved_count = 0
+    freed_size = 0
+    for group in groups:
+        original = group[0]
+        for duplicate in group[1:]:
+            relative_path = os.path.relpath(duplicate.path, root_path)
+            try:
+                if action == 'delete':
+                    os.remove(duplicate.path)
+                else:
+                    temp_link_path = duplicate.path + '.~organizador_link'
+                    os.link(original.path, temp_link_path)
+                    os.replace(temp_link_path, duplicate.path)
+                resolved_count += 1
+                freed_size += duplicate.size
+            except Exception as e:
+                print(f"Erro ao processar '{relative_path}': {e}")
+    return resolved_count, freed_size
+
+def find_duplicates(action=None, root=None, assume_yes=False, interactive=True):
+    """
+    Procura arquivos duplicados (conteúdo idêntico) na pasta Downloads e mostra os grupos.
+    'action' pode ser 'report' (só relatar), 'delete' ou 'hardlink'; se for None,
+    a ação é perguntada ao usuário. Retorna um dicionário com o resumo da operação.
+    """
+    downloads_path = root or get_downloads_path()
+    summary = {'operation': 'duplicates', 'root': downloads_path}
+
+    if not os.path.exists(downloads_path):
+        print(f"Erro: A pasta de Downloads não foi encontrada em '{downloads_path}'.")
+        pause(interactive)
+        return dict(summary, status='error')
+
+    print(f"\n--- Procurando arquivos duplicados em '{downloads_path}' ---")
+    conn = open_scan_index()
+    try:
+        groups = find_duplicate_groups(downloads_path, conn)
+    finally:
+        conn.close()
+
+    if not groups:
+        print("Nenhum arquivo duplicado encontrado.")
+        pause(interactive)
+        return dict(summary, status='nothing_to_do', groups=0)
+
+    wasted_size = 0
+    for i, group in enumerate(groups):
+        print(f"\nGrupo {i+1} ({convert_bytes(group[0].size)} cada):")
+        print(f"  [manter] {os.path.relpath(group[0].path, downloads_path)}")
+        for duplicate in group[1:]:
+            print(f"  [cópia]  {os.path.relpath(duplicate.path, downloads_path)}")
+            wasted_size += duplicate.size
+
+    duplicate_count = sum(len(group) - 1 for group in groups)
+    print(f"\nTotal de {duplicate_count} cópias em {len(groups)} grupos, ocupando {convert_bytes(wasted_size)}.")
+    summary.update(groups=len(groups), duplicates=duplicate_count, wasted_bytes=wasted_size)
+
+    if action is None:
+        escolha = input("\nDigite 'apagar' para remover as cópias, 'link' para trocá-las por hardlinks "
+                        "ou Enter para apenas relatar: ").strip().lower()
+        action = {'apagar': 'delete', 'link': 'hardlink'}.get(escolha, 'report')
+
+    if action == 'report':
+        pause(interactive)
+        return dict(summary, status='ok')
+
+    if not confirm("Digite 'confirmar' para prosseguir: ", 'confirmar', assume_yes):
+        print("Operação cancelada. Nada foi modificado.")
+        pause(interactive)
+        return dict(summary, status='cancelled')
+
+    resolved_count, freed_size = resolve_duplicates(groups, action, downloads_path)
+    verb = "removidas" if action == 'delete' else "substituídas por hardlinks"
+    print(f"\n{resolved_count} cópias {verb}. Espaço liberado: {convert_bytes(freed_size)}.")
+    pause(interactive)
+    return dict(summary, status='ok', action=action, resolved=resolved_count, freed_bytes=freed_size,
+                errors=duplicate_count - resolved_count)
+
+
+# --- Fotos parecidas ---
+
+def _downscale_gray(image, width, height):
+    """
+    Reduz uma imagem em tons de cinza para width x height pela média de cada bloco.
+    Com NumPy a média é feita de uma vez só (np.add.reduceat nas duas direções);
+    sem NumPy (ou em imagens menores que o destino), o redimensionamento BOX da Pillow faz o mesmo.
+    """
+    if np is None or image.width < width or image.height < height:
+        return list(image.resize((width, height), Image.BOX).getdata())
+    pixels = np.asarray(image, dtype=np.float32)
+    row_starts = (np.arange(height) * pixels.shape[0]) // height
+    col_starts = (np.arange(width) * pixels.shape[1]) // width
+    row_sizes = np.diff(np.append(row_starts, pixels.shape[0]))
+    col_sizes = np.diff(np.append(col_starts, pixels.shape[1]))
+    sums = np.add.reduceat(np.add.reduceat(pixels, row_starts, axis=0), col_starts, axis=1)
+    return (sums / np.outer(row_sizes, col_sizes)).ravel().tolist()
+
+def compute_photo_hash(file_path, method='dhash'):
+    """
+    Calcula o hash perceptual de 64 bits de uma foto: 'dhash' (gradiente horizontal,
+    padrão) ou 'ahash' (comparação com a média). Retorna None se a imagem não abrir.
+    """
+    try:
+        with Image.open(file_path) as image:
+            image.draft('L', (64, 64)) # JPEG: decodifica já reduzido, bem mais rápido
+            image = image.convert('L')
+            if method == 'ahash':
+                pixels = _downscale_gray(image, 8, 8)
+                mean = sum(pixels) / len(pixels)
+                bits = [p > mean for p in pixels]
+            else:
+                pixels = _downscale_gray(image, 9, 8)
+                bits = [pixels[row * 9 + col + 1] > pixels[row * 9 + col] for row in range(8) for col in range(8)]
+    except Exception:
+        return None
+    value = 0
+    for bit in bits:
+        value = (value << 1) | int(bit)
+    return value
+
+def _photo_hash_worker(file_path):
+    """Função executada no pool de processos."""
+    return compute_photo_hash(file_path)
+
+class BKTree:
+    """
+    Árvore BK sobre a distância de Hamming: permite achar todos os hashes a até
+    N bits de distância sem comparar cada foto com todas as outras.
+    """
+
+    def __init__(self):
+        self._root = None
+
+    def add(self, value, item):
+        if self._root is None:
+            self._root = (value, [item], {})
+            return
+        node = self._root
+        while True:
+            node_value, items, children = node
+            distance = (value ^ node_value).bit_count()
+            if distance == 0:
+                items.append(item)
+                return
+            child = children.get(distance)
+            if child is None:
+                children[distance] = (value, [item], {})
+                return
+            node = child
+
+    def search(self, value, max_distance):
+        """Retorna os itens cujo hash está a até 'max_distance' bits de 'value'."""
+        found = []
+        pending = [self._root] if self._root is not None else []
+        while pending:
+            node_value, items, children = pending.pop()
+            distance = (value ^ node_value).bit_count()
+            if distance <= max_distance:
+                found.extend(items)
+            for child_distance in range(distance - max_distance, distance + max_distance + 1):
+                child = children.get(child_distance)
+                if child is not None:
+                    pending.append(child)
+        return found
+
+def find_similar_photo_groups(root_path, conn, threshold=SIMILAR_PHOTO_THRESHOLD):
+    """
+    Agrupa as fotos (extensões da categoria 'Fotos') sob 'root_path' cujos hashes
+    perceptuais diferem em até 'threshold' bits. Os hashes são calculados em um pool
+    de processos e guardados em cache no índice pela chave (inode, tamanho, mtime).
+    Retorna uma lista de grupos (listas de ScanEntry), do maior para o menor.
+    """
+    photo_extensions = frozenset(CLASSIFIER.extensions_by_category['Fotos'])
+    photos = [e for e in scan_directory(root_path, recursive=True)
+              if e.is_file and e.size > 0 and e.extension in photo_extensions]
+
+    hashes = {}
+    missing = []
+    for entry in photos:
+        row = conn.execute("SELECT dhash FROM photo_hashes WHERE inode = ? AND size = ? AND mtime = ?",
+                           (entry.inode, entry.size, entry.mtime)).fetchone()
+        if row:
+            hashes[entry.path] = row[0]
+        else:
+            missing.append(entry)
+
+    if missing:
+        print(f"Calculando o hash de {len(missing)} fotos...")
+        with ProcessPoolExecutor() as executor:
+            computed = list(executor.map(_photo_hash_worker, [e.path for e in missing], chunksize=32))
+        with conn:
+            for entry, value in zip(missing, computed):
+                if value is None:
+                    continue
+                hashes[entry.path] = value
+                # O hash é gravado como inteiro com sinal, que é o que o SQLite aceita
+                signed_value = value - (1 << 64) if value >= (1 << 63) else value
+                conn.execute("INSERT OR REPLACE INTO photo_hashes VALUES (?, ?, ?, ?)",
+                             (entry.inode, entry.size, entry.mtime, signed_value))
+
+    hashed_photos = [e for e in photos if e.path in hashes]
+    tree = BKTree()
+    for index, entry in enumerate(hashed_photos):
+        tree.add(hashes[entry.path] & ((1 << 64) - 1), index)
+
+    # União das fotos vizinhas (union-find) para formar os grupos
+    parent = list(range(len(hashed_photos)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for index, entry in enumerate(hashed_photos):
+        for neighbor in tree.search(hashes[entry.path] & ((1 << 64) - 1), threshold):
+            root_a, root_b = find(index), find(neighbor)
+            if root_a != root_b:
+                parent[root_b] = root_a
+
+    groups_by_root = {}
+    for index, entry in enumerate(hashed_photos):
+        groups_by_root.setdefault(find(index), []).append(entry)
+
+    groups = [sorted(group, key=lambda e: (-e.size, e.path)) for group in groups_by_root.values() if len(group) > 1]
+    groups.sort(key=lambda group: (-len(group), group[0].path))
+    return groups
+
+def review_similar_photos(threshold=SIMILAR_PHOTO_THRESHOLD):
+    """
+    Procura fotos parecidas (rajadas, cópias reenviadas pelo WhatsApp etc.) e mostra
+    cada grupo para revisão, permitindo escolher quais fotos apagar.
+    """
+    downloads_path = get_downloads_path()
+
+    if Image is None:
+        print("Esta opção requer a biblioteca Pillow. Instale com: pip install pillow")
+        input("Pressione Enter para continuar.")
+        return
+
+    if not os.path.exists(downloads_path):
+        print(f"Erro: A pasta de Downloads não foi encontrada em '{downloads_path}'.")
+        input("Pressione Enter para continuar.")
+        return
+
+    print(f"\n--- Procurando fotos parecidas em '{downloads_path}' ---")
+    conn = open_scan_index()
+    try:
+        groups = find_similar_photo_groups(downloads_path, conn, threshold)
+    finally:
+        conn.close()
+
+    if not groups:
+        print("Nenhum grupo de fotos parecidas encontrado.")
+        input("Pressione Enter para continuar.")
+        return
+
+    print(f"{len(groups)} grupos de fotos parecidas encontrados.")
+    removed_count = 0
+    removed_size_total = 0
+
+    for group_number, group in enumerate(groups, start=1):
+        print(f"\nGrupo {group_number}/{len(groups)}:")
+        for i, entry in enumerate(group):
+            print(f"{i+1}. {os.path.relpath(entry.path, downloads_path)} ({convert_bytes(entry.size)})")
+
+        escolha = input("Números das fotos a apagar (ex: 2 3), Enter para pular ou 'sair': ").strip().lower()
+        if escolha == 'sair':
+            break
+
+        for token in escolha.split():
+            if not token.isdigit() or not 1 <= int(token) <= len(group):
+                print(f"Ignorado: '{token}' não é uma foto deste grupo.")
+                continue
+            entry = group[int(token) - 1]
+            try:
+                os.remove(entry.path)
+                print(f"Removido: {os.path.relpath(entry.path, downloads_path)}")
+                removed_count += 1
+                removed_size_total += entry.size
+            except Exception as e:
+                print(f"Erro ao remover '{os.path.relpath(entry.path, downloads_path)}': {e}")
+
+    print(f"\nRevisão concluída! {removed_count} fotos removidas, {convert_bytes(removed_size_total)} liberados.")
+    input("Pressione Enter para continuar.")
+
+
+def report_from_index():
+    """
+    Atualiza o índice persistente e mostra, a partir dele, os candidatos à limpeza
+    e à organização, sem varrer de novo as pastas que não mudaram.
+    """
+    downloads_path = get_downloads_path()
+
+    if not os.path.exists(downloads_path):
+        print(f"Erro: A pasta de Downloads não foi encontrada em '{downloads_path}'.")
+        input("Pressione Enter para continuar.")
+        return
+
+    print(f"\n--- Atualizando índice de '{downloads_path}' ---")
+    start_time = time.time()
+    conn = open_scan_index()
+    try:
+        rescanned, reused = refresh_scan_index(conn, downloads_path)
+        cleanup_candidates = query_cleanup_candidates(conn, downloads_path)
+        organize_candidates = query_organize_candidates(conn, downloads_path)
+    finally:
+        conn.close()
+    print(f"Índice atualizado em {time.time() - start_time:.2f}s "
+          f"({rescanned} pastas relistadas, {reused} reaproveitadas).")
+
+    print("\n--- Candidatos à limpeza (vazios/temporários): ---")
+    if cleanup_candidates:
+        total_size = 0
+        for f_path, reason, f_size in cleanup_candidates:
+            print(f"- {os.path.relpath(f_path, downloads_path)} (Motivo: {reason}, Tamanho: {convert_bytes(f_size)})")
+            total_size += f_size
+        print(f"Total: {len(cleanup_candidates)} arquivos, {convert_bytes(total_size)}.")
+    else:
+        print("Nenhum.")
+
+    print("\n--- Candidatos à organização por categoria: ---")
+    if organize_candidates:
+        for name, is_dir, category in organize_candidates:
+            if is_dir:
+                print(f"- {name}/ -> Pastas_Organizadas/")
+            else:
+                print(f"- {name} -> Categoria: {category}")
+    else:
+        print("Nenhum.")
+
+    input("\nPressione Enter para continuar.")
+
+
+def display_menu():
+    """Exibe o menu principal do organizador."""
+    print("\n" + "="*40)
+    print("      ORGANIZADOR DE DOWNLOADS CLI")
+    print("="*40)
+    print("1. Organizar arquivos (por categoria)")
+    print("2. Limpar arquivos (vazios/temporários)")
+    print("3. Remover pastas vazias") 
+    print("4. Organizar arquivos (por data)") 
+    print("5. Relatório rápido (índice)")
+    print("6. Encontrar arquivos duplicados")
+    print("7. Revisar fotos parecidas")
+    print("8. Sair") 
+    print("="*40)
+
+def main_menu(workers=DEFAULT_MOVE_WORKERS):
+    """Loop principal do menu do aplicativo."""
+    latest_journal = find_latest_journal()
+    if latest_journal and not MoveJournal.is_finished_file(latest_journal):
+        print("\nAviso: a última organização foi interrompida. Rode o organizador com 'resume' para "
+              "continuar de onde parou, ou com 'undo' para desfazê-la.")
+    while True:
+        display_menu()
+        choice = input("Digite sua escolha (1-8): ").strip() 
+
+        if choice == '1':
+            organize_files_in_downloads(workers)
+        elif choice == '2':
+            clean_files()
+        elif choice == '3': 
+            remove_empty_folders()
+        elif choice == '4': 
+            organize_by_date(workers)
+        elif choice == '5':
+            report_from_index()
+        elif choice == '6':
+            find_duplicates()
+        elif choice == '7':
+            review_similar_photos()
+        elif choice == '8': 
+            print("Saindo do organizador. Até mais!")
+            break
+        else:
+            print("Opção inválida. Por favor, escolha 1, 2, 3, 4, 5, 6, 7 ou 8.") 
+            input("Pressione Enter para continuar.")
+
+def parse_args(argv=None):
+    """Lê as opções de linha de comando. Sem subcomando, abre o menu interativo."""
+    parser = argparse.ArgumentParser(description="Organizador de Downloads para Termux.")
+    parser.add_argument('--workers', type=int, default=DEFAULT_MOVE_WORKERS,
+                        help=f"threads usadas para mover arquivos (padrão: {DEFAULT_MOVE_WORKERS})")
+    parser.add_argument('--log-file', metavar='ARQUIVO',
+                        help="grava as linhas por arquivo (movidos/removidos) neste arquivo")
+    parser.add_argument('--rules', metavar='ARQUIVO',
+                        help="arquivo de regras de categoria (TOML/JSON; padrão: regras.toml ou regras.json na pasta de dados)")
+    parser.add_argument('--date-locale', choices=sorted(MONTH_NAMES), default=DEFAULT_DATE_LOCALE,
+                        help=f"idioma dos nomes das pastas de mês (padrão: {DEFAULT_DATE_LOCALE})")
+    parser.add_argument('--walk-workers', type=int, default=WALK_WORKERS,
+                        help=f"threads da varredura recursiva (limpeza, pastas vazias e manutenção; padrão: {WALK_WORKERS})")
+    parser.add_argument('--refresh-rate', type=float, default=PROGRESS_SETTINGS['redraws_per_second'],
+                        help="redesenhos da barra de progresso por segundo")
+    parser.add_argument('--profile', action='store_true',
+                        help="mede o tempo de cada fase e as chamadas de sistema e mostra a tabela ao final (em stderr)")
+    parser.add_argument('--profile-stats', metavar='ARQUIVO',
+                        help="com o perfil, grava também a saída do cProfile (para o pstats) neste arquivo")
+    parser.add_argument('--profile-trace', metavar='ARQUIVO',
+                        help="com o perfil, grava as fases como trace JSON (chrome://tracing, Perfetto)")
+
+    # Opções comuns aos subcomandos
+    unattended = argparse.ArgumentParser(add_help=False)
+    unattended.add_argument('--json', action='store_true', help="imprime o resumo em JSON (mensagens vão para stderr)")
+    unattended.add_argument('--yes', action='store_true', help="não pede confirmação (para execuções agendadas)")
+    common = argparse.ArgumentParser(add_help=False, parents=[unattended])
+    common.add_argument('--root', help="pasta a ser tratada (padrão: ~/storage/downloads)")
+    simulation = argparse.ArgumentParser(add_help=False)
+    simulation.add_argument('--dry-run', action='store_true', help="só mostra o que seria feito")
+
+    subparsers = parser.add_subparsers(dest='command', metavar='COMANDO')
+
+    organize_parser = subparsers.add_parser('organize', parents=[common, simulation],
+                                            help="organiza por categoria (opção 1 do menu)")
+    organize_parser.add_argument('--export-plan', metavar='ARQUIVO',
+                                 help="só gera o plano (JSON ou .ndjson) para executar depois")
+    organize_parser.add_argument('--execute-plan', metavar='ARQUIVO',
+                                 help="executa um plano gerado com --export-plan")
+    organize_parser.add_argument('--async', dest='async_pipeline', action='store_true',
+                                 help="usa o pipeline assíncrono (varredura, plano e movimentação simultâneos)")
+    organize_parser.add_argument('--sniff', action='store_true',
+                                 help="classifica pelo conteúdo os arquivos sem extensão conhecida")
+
+    clean_parser = subparsers.add_parser('clean', parents=[common, simulation],
+                                         help="remove arquivos vazios/temporários (opção 2 do menu)")
+    clean_parser.add_argument('--batch-size', type=int, default=CLEAN_BATCH_SIZE,
+                              help=f"arquivos removidos por lote (padrão: {CLEAN_BATCH_SIZE})")
+
+    subparsers.add_parser('prune-empty', parents=[common, simulation],
+                          help="remove pastas vazias (opção 3 do menu)")
+    maintenance_parser = subparsers.add_parser('maintenance', parents=[common, simulation],
+                                               help="limpa, organiza e remove pastas vazias com uma única varredura")
+    maintenance_parser.add_argument('--batch-size', type=int, default=CLEAN_BATCH_SIZE,
+                                    help=f"arquivos removidos por lote (padrão: {CLEAN_BATCH_SIZE})")
+    subparsers.add_parser('by-date', parents=[common, simulation],
+                          help="organiza por ano/mês (opção 4 do menu)")
+    subparsers.add_parser('merge-date-folders', parents=[common, simulation],
+                          help="junta as pastas de mês separadas por idiomas diferentes (ex: '03 - March' e '03 - Março')")
+
+    duplicates_parser = subparsers.add_parser('duplicates', parents=[common],
+                                              help="procura arquivos com conteúdo idêntico (opção 6 do menu)")
+    duplicates_parser.add_argument('--action', choices=['report', 'delete', 'hardlink'], default='report',
+                                   help="o que fazer com as cópias (padrão: report)")
+
+    for command, help_text in (('resume', "retoma a última organização interrompida, pelo diário"),
+                               ('undo', "desfaz a última organização registrada no diário")):
+        journal_parser = subparsers.add_parser(command, parents=[unattended], help=help_text)
+        journal_parser.add_argument('--journal', metavar='ARQUIVO',
+                                    help="diário a usar (padrão: o mais recente)")
+
+    watch_parser = subparsers.add_parser('watch', parents=[common],
+                                         help="fica observando Downloads e organiza cada download concluído")
+    watch_parser.add_argument('--poll', action='store_true',
+                              help="usa polling em vez de inotify (ex: quando os eventos não chegam)")
+    watch_parser.add_argument('--stable-seconds', type=float, default=WATCH_STABLE_SECONDS,
+                              help=f"segundos sem mudança para um arquivo contar como completo (padrão: {WATCH_STABLE_SECONDS})")
+    watch_parser.add_argument('--sniff', action='store_true',
+                              help="classifica pelo conteúdo os arquivos sem extensão conhecida")
+    return parser.parse_args(argv)
+
+def run_command(args):
+    """Executa um subcomando sem passar pelo menu e retorna o resumo da operação."""
+    if args.command == 'resume':
+        return resume_moves(args.workers, journal_path=args.journal, assume_yes=args.yes, interactive=False)
+    if args.command == 'undo':
+        return undo_moves(journal_path=args.journal, assume_yes=args.yes, interactive=False)
+
+    options = {'root': args.root, 'assume_yes': args.yes, 'interactive': False}
+
+    if args.command == 'organize':
+        if args.export_plan:
+            plan = build_category_move_plan(args.root or get_downloads_path(), sniff=args.sniff, workers=args.workers)
+            export_move_plan(plan, args.export_plan)
+            print(f"Plano com {len(plan)} ações gravado em '{args.export_plan}'.")
+            return {'operation': 'organize', 'status': 'ok', 'planned': len(plan), 'plan_file': args.export_plan}
+        if args.async_pipeline and not args.dry_run:
+            return organize_files_async(args.workers, sniff=args.sniff, **options)
+        plan = load_move_plan(args.execute_plan) if args.execute_plan else None
+        return organize_files_in_downloads(args.workers, dry_run=args.dry_run, plan=plan, sniff=args.sniff, **options)
+    if args.command == 'clean':
+        return clean_files(dry_run=args.dry_run, batch_size=args.batch_size, walk_workers=args.walk_workers, **options)
+    if args.command == 'prune-empty':
+        return remove_empty_folders(dry_run=args.dry_run, walk_workers=args.walk_workers, **options)
+    if args.command == 'maintenance':
+        return run_maintenance(args.workers, dry_run=args.dry_run, batch_size=args.batch_size,
+                               walk_workers=args.walk_workers, **options)
+    if args.command == 'by-date':
+        return organize_by_date(args.workers, dry_run=args.dry_run, **options)
+    if args.command == 'merge-date-folders':
+        return merge_date_folders(args.workers, dry_run=args.dry_run, **options)
+    if args.command == 'duplicates':
+        return find_duplicates(action=args.action, **options)
+    if args.command == 'watch':
+        return watch_downloads(args.workers, root=args.root, poll=args.poll,
+                               stable_seconds=args.stable_seconds, interactive=False, sniff=args.sniff)
+
+def main(argv=None):
+    """Ponto de entrada: menu interativo ou subcomando. Retorna o código de saída."""
+    args = parse_args(argv)
+    PROGRESS_SETTINGS.update(redraws_per_second=args.refresh_rate, log_path=args.log_file)
+    DATE_FOLDERS.configure(args.date_locale)
+    rules_path = args.rules or find_rules_file()
+    if rules_path:
+        try:
+            apply_rules(load_rules_file(rules_path))
+        except (OSError, ValueError) as e:
+            print(f"Erro no arquivo de regras '{rules_path}': {e}", file=sys.stderr)
+            return 1
+    profile_enabled = args.profile or args.profile_stats or args.profile_trace
+    session = profiling(args.profile_stats, args.profile_trace) if profile_enabled else contextlib.nullcontext()
+    if args.command is None:
+        with session:
+            main_menu(args.workers)
+        return 0
+
+    if args.json:
+        # As mensagens normais vão para stderr; stdout fica só com o JSON do resumo
+        with contextlib.redirect_stdout(sys.stderr), session:
+            summary = run_command(args)
+        if profile_enabled:
+            summary['profile'] = PROFILER.as_dict()
+        print(json.dumps(summary, ensure_ascii=False))
+    else:
+        with session:
+            summary = run_command(args)
+
+    failed = summary.get('status') == 'error' or summary.get('errors', 0) > 0
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())